@@ -1,36 +1,82 @@
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlmodel import Session, select
-from app.db.session import get_session
-from app.core.security import decode_token, hash_password
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import async_engine, get_async_read_session
+from app.core.cache import TTLCache
+from app.core.security import HasherBusy, decode_token, password_hasher
 from app.core.config import settings
 from app.models.user import User
 
 bearer = HTTPBearer(auto_error=False)
 
-def get_current_user(
+# token (or dev marker) -> User fields; skips jwt.decode + the User query on hits
+_user_cache = TTLCache(maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds)
+_DEV_KEY = ("dev",)
+
+def invalidate_user(email: str) -> None:
+    _user_cache.pop_where(lambda data: data["email"] == email)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_change(mapper, connection, target: User):
+    invalidate_user(target.email)
+
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+def _cache_user(key, user: User, ttl: float | None = None) -> User:
+    _user_cache.set(key, user.model_dump(), ttl)
+    return user
+
+async def get_current_user(
     creds: HTTPAuthorizationCredentials = Depends(bearer),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ) -> User:
     # ✅ DEV: 로그인 완전 우회
     if settings.dev_bypass_auth:
+        cached = _user_cache.get(_DEV_KEY)
+        if cached:
+            return User(**cached)
         dev_email = "dev@local"
-        user = session.exec(select(User).where(User.email == dev_email)).first()
+        user = (await session.exec(select(User).where(User.email == dev_email))).first()
         if not user:
-            user = User(email=dev_email, password_hash=hash_password("dev"), name="DEV")
-            session.add(user)
-            session.commit()
-            session.refresh(user)
-        return user
+            try:
+                password_hash = await password_hasher.hash("dev")
+            except HasherBusy:
+                raise hasher_busy()
+            async with AsyncSession(async_engine, expire_on_commit=False) as writer:
+                user = User(email=dev_email, password_hash=password_hash, name="DEV")
+                writer.add(user)
+                try:
+                    await writer.commit()
+                    await writer.refresh(user)
+                except IntegrityError:
+                    # a concurrent first request created it
+                    await writer.rollback()
+                    user = (await writer.exec(select(User).where(User.email == dev_email))).one()
+        return _cache_user(_DEV_KEY, user)
 
     # 일반 모드(로그인 필요)
     if not creds:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_token(creds.credentials)
+    token = creds.credentials
+    cached = _user_cache.get(token)
+    if cached:
+        return User(**cached)
+    payload = decode_token(token)
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     user_email = payload["sub"]
-    user = session.exec(select(User).where(User.email == user_email)).first()
+    user = (await session.exec(select(User).where(User.email == user_email))).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    # never serve a token from cache past its own expiry
+    return _cache_user(token, user, ttl=payload["exp"] - time.time() if "exp" in payload else None)
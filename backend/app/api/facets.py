@@ -0,0 +1,47 @@
+"""Grouped counts behind the list filter chips: ``GET /{entity}/facets``.
+
+Takes the same query string as the list endpoint. Each field's counts apply
+every active filter except the field's own, so the other values of a field
+that is already filtered stay visible (repeated parameters match any value).
+A field with no other filter active is read from ``facetcount``
+(app.db.facets) without touching the entity table; otherwise it is a GROUP BY
+over the filtered rows, which the column indexes serve.
+"""
+from __future__ import annotations
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.datastructures import QueryParams
+
+from app.api.filters import filter_conditions
+from app.db.facets import FACET_FIELDS
+from app.models.facet_count import FacetCount
+from app.models.registry import ENTITY_MODELS
+
+
+async def facet_counts(session: AsyncSession, entity: str, query: QueryParams) -> dict[str, list[dict]]:
+    """``{"status": [{"value": "사용중", "count": 12}, ...], ...}``, most frequent value first."""
+    model = ENTITY_MODELS[entity]
+    facets: dict[str, list[dict]] = {field: [] for field in FACET_FIELDS[entity]}
+    stored = []
+    for field in facets:
+        where = filter_conditions(model, QueryParams([(k, v) for k, v in query.multi_items() if k != field]))
+        if not where:
+            stored.append(field)
+            continue
+        column = model.__table__.c[field]
+        count = func.count()
+        rows = await session.exec(
+            select(column, count).where(column.is_not(None), *where).group_by(column).order_by(count.desc(), column)
+        )
+        facets[field] = [{"value": value, "count": n} for value, n in rows]
+    if stored:
+        rows = await session.exec(
+            select(FacetCount.field, FacetCount.value, FacetCount.count)
+            .where(FacetCount.entity == entity, FacetCount.field.in_(stored))
+            .order_by(FacetCount.field, FacetCount.count.desc(), FacetCount.value)
+        )
+        for field, value, n in rows:
+            facets[field].append({"value": value, "count": n})
+    return facets
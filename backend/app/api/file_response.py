@@ -0,0 +1,86 @@
+"""File responses with validators for downloads and attachment serving.
+
+ETags are strong and derived from the content SHA-256, so they survive
+restarts and identical files share them. ``If-None-Match`` /
+``If-Modified-Since`` short-circuit to 304; ``Range`` / ``If-Range`` (single
+and multi-range) are handled by Starlette's ``FileResponse`` using the same
+validators (patched below where Starlette 0.41 falls short).
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+
+class _ValidatedFileResponse(FileResponse):
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:
+        # Starlette compares If-Range with its own mtime-based ETag; use ours (strong only)
+        etag = self.headers["etag"]
+        return http_if_range == self.headers["last-modified"] or (not etag.startswith("W/") and http_if_range == etag)
+
+    async def _handle_multiple_ranges(self, send, ranges, file_size, send_header_only):
+        # Starlette 0.41 sends the multipart boundary as Content-Range; it belongs in Content-Type
+        async def fixed_send(message):
+            if message["type"] == "http.response.start":
+                headers = dict(message["headers"])
+                if headers.get(b"content-range", b"").startswith(b"multipart/"):
+                    message["headers"] = [
+                        (b"content-type" if k == b"content-range" else k, v)
+                        for k, v in message["headers"]
+                        if k != b"content-type"
+                    ]
+            await send(message)
+
+        await super()._handle_multiple_ranges(fixed_send, ranges, file_size, send_header_only)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison, as RFC 9110 requires for If-None-Match
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since
+
+
+def file_response(
+    request: Request,
+    path: str,
+    *,
+    sha256: Optional[str],
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> Response:
+    stat = os.stat(path)
+    etag = f'"{sha256}"' if sha256 else f'W/"{int(stat.st_mtime)}-{stat.st_size}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": "private, no-cache",  # always revalidate; 304 is cheap
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = if_modified_since is not None and _not_modified_since(if_modified_since, stat.st_mtime)
+    if not_modified and request.method in ("GET", "HEAD"):
+        return Response(status_code=304, headers=headers)
+
+    return _ValidatedFileResponse(
+        path,
+        media_type=media_type or "application/octet-stream",
+        filename=filename,
+        headers=headers,
+        stat_result=stat,
+    )
@@ -0,0 +1,89 @@
+"""Column filters shared by the list endpoints and exports.
+
+Every indexed column of an entity (except the primary key and timestamps) can
+be used as an equality filter, e.g. ``?status=사용중&domain=세포``. Repeating a
+parameter matches any of its values (``?status=사용중&status=점검중``).
+
+``?tag=qPCR&tag=IL6`` keeps rows carrying every listed tag; add
+``tag_match=any`` for rows carrying at least one. Tags are matched whole
+through the link tables (app.db.tags), so ``PCR`` does not match ``qPCR``.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable
+
+from fastapi import HTTPException, Request
+from sqlmodel import select
+from starlette.datastructures import QueryParams
+
+from app.models.registry import ENTITY_MODELS
+from app.models.tag import TAG_LINKS, Tag
+
+NOT_FILTERABLE = {"id", "created_at", "updated_at"}
+
+# entity model -> its tag link table
+_TAG_LINKS = {ENTITY_MODELS[entity]: link for entity, link in TAG_LINKS.items()}
+
+
+@lru_cache
+def filter_columns(model) -> dict:
+    return {c.name: c for c in model.__table__.c if c.index and c.name not in NOT_FILTERABLE}
+
+
+_BOOLS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def _parse(python_type, value: str):
+    if python_type is bool:
+        return _BOOLS[value.lower()]
+    if python_type is datetime:  # before date: datetime is a date subclass
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def _coerce(column, value: str):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is str:
+        return value
+    try:
+        return _parse(python_type, value)
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(400, f"Invalid value for {column.name}: {value!r}")
+
+
+def filter_conditions(model, query: QueryParams) -> list:
+    conditions = []
+    for name, column in filter_columns(model).items():
+        values = [_coerce(column, v) for v in query.getlist(name)]
+        if len(values) == 1:
+            conditions.append(column == values[0])
+        elif values:
+            conditions.append(column.in_(values))
+    tags = query.getlist("tag")
+    link = _TAG_LINKS.get(model)
+    if tags and link is not None:
+        match = query.get("tag_match", "all")
+        if match not in ("all", "any"):
+            raise HTTPException(400, "tag_match must be 'all' or 'any'")
+        tagged = select(link.entity_id).join(Tag, Tag.id == link.tag_id)
+        if match == "any":
+            conditions.append(model.id.in_(tagged.where(Tag.name.in_(tags))))
+        else:
+            conditions += [model.id.in_(tagged.where(Tag.name == t)) for t in dict.fromkeys(tags)]
+    return conditions
+
+
+def list_filters(model) -> Callable[[Request], list]:
+    """Dependency returning the WHERE conditions for ``model`` from the query string."""
+
+    def dependency(request: Request) -> list:
+        return filter_conditions(model, request.query_params)
+
+    return dependency
@@ -0,0 +1,54 @@
+"""orjson responses, and a row -> JSON path that skips the ORM and ``response_model``.
+
+``FastJSONResponse`` is the API's default response class. FastAPI hands it
+content that is already JSON-ready (plain dicts, lists, str, int, bool),
+and for that content orjson writes the same bytes as Starlette's ``json.dumps``
+(compact, UTF-8). The one difference is floats in exponent form (``1e-07``
+vs ``1e-7``), so routes that can return such floats keep ``JSONResponse``.
+
+List and sync endpoints select plain columns and turn the rows into dicts
+(``row_dicts``): sync sends every column (``row_columns``), lists leave the
+compressed bodies out (``list_columns``) so a page never runs zstd. orjson then encodes the dates and datetimes
+itself, the way pydantic would. The keys follow the model's field declaration
+order (``model_fields``), so each row encodes to the same bytes as pydantic's
+``model_dump_json`` of the validated model (tests/test_json_response.py).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy import Column
+
+from app.core.compression import CompressedText
+
+# aware datetimes as "...Z", like pydantic; SQLite hands back naive ones anyway
+OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def row_columns(model) -> tuple[Column, ...]:
+    """``model``'s columns in field declaration order, the order pydantic serializes the model in."""
+    return tuple(model.__table__.c[name] for name in model.model_fields if name in model.__table__.c)
+
+
+@lru_cache(maxsize=None)
+def list_columns(model) -> tuple[Column, ...]:
+    """``row_columns`` minus the ``CompressedText`` bodies: what list-shaped responses carry."""
+    return tuple(c for c in row_columns(model) if not isinstance(c.type, CompressedText))
+
+
+def row_dicts(rows: Iterable, keys: Iterable[str]) -> list[dict]:
+    keys = tuple(keys)
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,133 @@
+"""Precomputed equipment maintenance schedule behind GET /equipment/maintenance-due.
+
+The snapshot holds every equipment row due up to ``settings.maintenance_horizon_days``
+ahead, sorted by ``(next_maintenance_on, id)``, so a date window is two bisects
+instead of a query. Requests rebuild it when the day rolls over or when the
+"equipment" response-cache generation moves (this worker's writes bump it at
+once). Writes made by other workers only show up there with a shared cache
+store, so the background task started in the app lifespan also compares a
+database-side change marker (newest ``updated_at``, newest equipment
+tombstone) every ``settings.maintenance_refresh_seconds`` and rebuilds when it
+moved.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.response_cache import response_cache
+from app.core.config import settings
+from app.db.session import async_read_engine
+from app.models.equipment import Equipment
+from app.models.tombstone import Tombstone
+
+logger = logging.getLogger(__name__)
+
+# what the maintenance board shows; skips the markdown bodies
+MAINTENANCE_FIELDS = ("id", "name", "asset_no", "status", "facility_id", "location_detail", "owner",
+                      "maintenance_cycle", "last_maintenance_date", "next_maintenance_date",
+                      "last_maintenance_on", "next_maintenance_on")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    as_of: date
+    until: date  # rows due on or before this day are included
+    generation: int
+    version: tuple  # _version() when built
+    keys: list[tuple[date, int]]  # (next_maintenance_on, id), parallel to rows
+    rows: list[dict]
+
+
+class MaintenanceSchedule:
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self, snap: Optional[Snapshot]) -> bool:
+        return (
+            snap is not None
+            and snap.as_of == date.today()
+            and snap.generation == response_cache.generation("equipment")
+        )
+
+    async def snapshot(self) -> Snapshot:
+        if self._fresh(self._snapshot):
+            return self._snapshot
+        async with self._lock:  # one rebuild however many requests are waiting
+            if not self._fresh(self._snapshot):
+                self._snapshot = await self._build()
+            return self._snapshot
+
+    async def _build(self) -> Snapshot:
+        # generation first: a write committed while we query leaves the snapshot stale, not wrong
+        generation = response_cache.generation("equipment")
+        version = await _version()
+        today = date.today()
+        until = today + timedelta(days=self.horizon_days)
+        rows = await _query(None, until)
+        return Snapshot(today, until, generation, version, [(r["next_maintenance_on"], r["id"]) for r in rows], rows)
+
+    async def due(self, start: date, end: date) -> tuple[date, list[dict], list[dict]]:
+        """(as_of, overdue, due between ``start`` and ``end`` inclusive but not before today)."""
+        snap = await self.snapshot()
+        today = snap.as_of
+        cut = bisect.bisect_left(snap.keys, (today,))
+        overdue = snap.rows[:cut]
+        start = max(start, today)
+        if end <= snap.until:
+            lo = bisect.bisect_left(snap.keys, (start,))
+            hi = bisect.bisect_left(snap.keys, (end + timedelta(days=1),))
+            due = snap.rows[lo:hi]
+        else:
+            # beyond the precomputed horizon: an index range scan
+            due = await _query(start, end)
+        return today, overdue, due
+
+    async def refresh(self) -> None:
+        """Rebuild if stale by date or generation, or if the equipment table changed in the database."""
+        snap = await self.snapshot()
+        if await _version() == snap.version:
+            return
+        async with self._lock:
+            if self._snapshot is snap:
+                self._snapshot = await self._build()
+
+    async def run(self, interval: float) -> None:
+        """Background loop: ``refresh`` every ``interval`` seconds."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("maintenance schedule refresh failed")
+            await asyncio.sleep(interval)
+
+
+async def _version() -> tuple:
+    """Moves with every equipment write from any process: ORM writes and imports stamp
+    ``updated_at``, deletes leave a tombstone. Two index lookups."""
+    async with AsyncSession(async_read_engine) as session:
+        updated = (await session.exec(select(func.max(Equipment.updated_at)))).one()
+        deleted = (await session.exec(select(func.max(Tombstone.id)).where(Tombstone.entity == "equipment"))).one()
+    return updated, deleted
+
+
+async def _query(start: Optional[date], end: date) -> list[dict]:
+    cols = [Equipment.__table__.c[f] for f in MAINTENANCE_FIELDS]
+    stmt = select(*cols).where(Equipment.next_maintenance_on.is_not(None), Equipment.next_maintenance_on <= end)
+    if start is not None:
+        stmt = stmt.where(Equipment.next_maintenance_on >= start)
+    async with AsyncSession(async_read_engine) as session:
+        rows = (await session.exec(stmt.order_by(Equipment.next_maintenance_on, Equipment.id))).all()
+    return [r._asdict() for r in rows]
+
+
+maintenance_schedule = MaintenanceSchedule(horizon_days=settings.maintenance_horizon_days)
@@ -0,0 +1,117 @@
+"""Keyset (cursor) pagination and sparse field projection for list endpoints.
+
+List endpoints keep returning a plain JSON array (the Flutter client expects
+one); the cursor for the next page travels in the ``X-Next-Cursor`` header and
+is absent on the last page. Without ``limit`` or ``cursor`` a list returns
+every row, as it did before paging existed (the Flutter client does not
+follow cursors); a ``cursor`` alone pages by ``DEFAULT_LIMIT``. Pages are read as plain rows and encoded straight
+to JSON (``app.api.json_response``): no ORM instances, no ``response_model``
+validation.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, NamedTuple, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.json_response import FastJSONResponse, list_columns, row_dicts
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    items: list[dict]
+    next_cursor: Optional[str]
+
+
+class PageParams(NamedTuple):
+    cursor: Optional[str]
+    limit: Optional[int]  # None: every row
+    fields: Optional[str]
+
+
+def page_params(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT, description=f"Page size; default all rows, or {DEFAULT_LIMIT} with a cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,title"),
+) -> PageParams:
+    if limit is None and cursor:
+        limit = DEFAULT_LIMIT
+    return PageParams(cursor, limit, fields)
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(400, "Invalid cursor")
+    return values
+
+
+def parse_fields(model, fields: Optional[str]) -> Optional[list[str]]:
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in model.__table__.c]
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in names:
+        names.insert(0, "id")
+    return names
+
+
+async def keyset_page(session: AsyncSession, model, sort: tuple, params: PageParams, *, descending: bool = False, where=()) -> Page:
+    """Fetch one page ordered by ``sort`` (a tuple of columns ending in a unique key).
+
+    With ``fields`` only the requested columns are selected. Without it, every
+    column but the compressed markdown bodies is (``list_columns``): they are
+    decompressed only for clients that ask for them here or read one item.
+    """
+    names = parse_fields(model, params.fields)
+    if names is None:
+        names = [c.name for c in list_columns(model)]
+    sort_names = [c.key for c in sort]
+    stmt = select(*[model.__table__.c[n] for n in dict.fromkeys(names + sort_names)])
+    for cond in where:
+        stmt = stmt.where(cond)
+
+    if params.cursor:
+        values = decode_cursor(params.cursor)
+        if len(values) != len(sort):
+            raise HTTPException(400, "Invalid cursor")
+        key, after = tuple_(*sort), tuple_(*values)
+        stmt = stmt.where(key < after if descending else key > after)
+
+    stmt = stmt.order_by(*[c.desc() if descending else c.asc() for c in sort])
+    if params.limit is not None:
+        stmt = stmt.limit(params.limit + 1)
+    rows = (await session.exec(stmt)).all()
+
+    next_cursor = None
+    if params.limit is not None and len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[n] for n in sort_names])
+
+    return Page(row_dicts(rows, names), next_cursor)
+
+
+def page_response(page: Page) -> FastJSONResponse:
+    """Return the page from a route; the rows bypass ``response_model`` (it only documents the shape)."""
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
+    return FastJSONResponse(page.items, headers=headers)
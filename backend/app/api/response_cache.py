@@ -0,0 +1,165 @@
+"""Response cache for read-mostly catalog GETs (templates, SOPs, facilities, equipment).
+
+Each entity has a generation number that its POST/PUT/DELETE handlers bump
+after committing (``response_cache.invalidate``). Cached bodies are keyed by
+route, query string and generation, so a bump makes every older entry
+unreachable at once. The ETag is derived from the same (generation, key)
+pair, which lets an unchanged client get a 304 without the body being built
+or even cached.
+
+With ``settings.response_cache_path`` set, generations and bodies also live in
+a small shared SQLite file, so workers see each other's invalidations and
+warm entries; the in-memory LRU stays in front of it.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.api.file_response import etag_matches
+from app.api.json_response import dumps
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+CACHE_CONTROL = "private, no-cache"  # always revalidate; 304 is cheap
+# headers worth replaying from the original response (e.g. X-Next-Cursor)
+_SKIP_HEADERS = {"content-length", "content-type", "etag", "cache-control"}
+
+
+class _SharedStore:
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute(f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS generation (entity TEXT PRIMARY KEY, gen INTEGER NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entry (key TEXT PRIMARY KEY, gen INTEGER NOT NULL, "
+                "expires REAL NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL)"
+            )
+
+    def generation(self, entity: str, initial: int) -> int:
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO generation VALUES (?, ?)", (entity, initial))
+            return self._conn.execute("SELECT gen FROM generation WHERE entity = ?", (entity,)).fetchone()[0]
+
+    def bump(self, entity: str, initial: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO generation VALUES (?, ?) ON CONFLICT(entity) DO UPDATE SET gen = gen + 1",
+                (entity, initial),
+            )
+            self._conn.execute("DELETE FROM entry WHERE expires <= ?", (time.time(),))
+
+    def get(self, key: str, gen: int) -> Optional[tuple[dict, bytes]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body FROM entry WHERE key = ? AND gen = ? AND expires > ?", (key, gen, time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key: str, gen: int, headers: dict, body: bytes, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entry VALUES (?, ?, ?, ?, ?)",
+                (key, gen, time.time() + ttl, json.dumps(headers), body),
+            )
+
+
+class CachedGet:
+    """Per-request handle: ``hit`` is a ready response, otherwise ``store`` the fresh one."""
+
+    def __init__(self, cache: ResponseCache, key: str, gen: int, etag: str, hit: Optional[Response]):
+        self._cache = cache
+        self._key = key
+        self._gen = gen
+        self.etag = etag
+        self.hit = hit
+
+    def store(self, content: Any, response: Optional[Response] = None) -> Response:
+        """Serialize ``content`` (models, dicts or a ready JSON response), cache it and return it."""
+        if isinstance(content, Response):
+            response, body = content, content.body
+        else:
+            body = dumps(jsonable_encoder(content))
+        headers = {k: v for k, v in (response.headers.items() if response else ()) if k.lower() not in _SKIP_HEADERS}
+        self._cache._put(self._key, self._gen, headers, body)
+        return self._cache._response(body, headers, self.etag)
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int, ttl: float, path: str = ""):
+        self.ttl = ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._shared = _SharedStore(path) if path else None
+        # in-process generations start from the boot time so ETags never repeat across restarts
+        self._initial = time.time_ns() // 1000
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, entity: str) -> int:
+        if self._shared:
+            return self._shared.generation(entity, self._initial)
+        with self._lock:
+            return self._generations.setdefault(entity, self._initial)
+
+    def invalidate(self, *entities: str) -> None:
+        for entity in entities:
+            if self._shared:
+                self._shared.bump(entity, self._initial)
+            else:
+                with self._lock:
+                    self._generations[entity] = self._generations.get(entity, self._initial) + 1
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def lookup(self, request: Request, entity: str) -> CachedGet:
+        gen = self.generation(entity)
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        key = f"{entity}:{request.url.path}?{query}"
+        etag = f'"{entity}.{gen}.{hashlib.sha1(key.encode()).hexdigest()[:12]}"'
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            return CachedGet(self, key, gen, etag, Response(status_code=304, headers=self._headers({}, etag)))
+        entry = self._memory.get((key, gen))
+        if entry is None and self._shared:
+            entry = self._shared.get(key, gen)
+            if entry is not None:
+                self._memory.set((key, gen), entry)
+        hit = self._response(entry[1], entry[0], etag) if entry else None
+        return CachedGet(self, key, gen, etag, hit)
+
+    def dependency(self, entity: str) -> Callable[[Request], Awaitable[CachedGet]]:
+        async def cached_get(request: Request) -> CachedGet:
+            return self.lookup(request, entity)
+
+        return cached_get
+
+    def _put(self, key: str, gen: int, headers: dict, body: bytes) -> None:
+        self._memory.set((key, gen), (headers, body))
+        if self._shared:
+            self._shared.set(key, gen, headers, body, self.ttl)
+
+    @staticmethod
+    def _headers(headers: dict, etag: str) -> dict:
+        return {**headers, "ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    def _response(self, body: bytes, headers: dict, etag: str) -> Response:
+        return Response(body, media_type="application/json", headers=self._headers(headers, etag))
+
+
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_size,
+    ttl=settings.response_cache_ttl_seconds,
+    path=settings.response_cache_path,
+)
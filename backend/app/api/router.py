@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.routes import auth, facilities, equipment, reagents, sops, templates, records, uploads, search
+from app.api.json_response import FastJSONResponse
+from app.api.routes import auth, facilities, equipment, reagents, sops, templates, records, uploads, search, imports, exports, sync, admin, tags
 
-api_router = APIRouter()
+# orjson for every route; list and sync endpoints also skip response_model (app.api.json_response)
+api_router = APIRouter(default_response_class=FastJSONResponse)
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(facilities.router, prefix="/facilities", tags=["facilities"])
 api_router.include_router(equipment.router, prefix="/equipment", tags=["equipment"])
@@ -13,3 +15,8 @@ api_router.include_router(records.router, prefix="/records", tags=["records"])
 
 api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
 api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(tags.router, prefix="/tags", tags=["tags"])
+api_router.include_router(imports.router, prefix="/import", tags=["import"])
+api_router.include_router(exports.router, prefix="/export", tags=["export"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.query_guard import explain_with, query_log
+from app.db.session import read_engine
+
+router = APIRouter()
+
+@router.get("/queries")
+async def query_report(_=Depends(get_current_user)):
+    """Slow statements, N+1 suspects and full table scans seen since start (or the last reset).
+
+    Plans come from EXPLAIN QUERY PLAN on the read-only engine; a ``full_scans``
+    entry names a table read end to end.
+    """
+    report = await run_in_threadpool(query_log.report, explain_with(read_engine))
+    return {
+        "enabled": settings.query_guard_enabled,
+        "slow_query_ms": settings.slow_query_ms,
+        "repeat_threshold": settings.query_repeat_threshold,
+        **report,
+    }
+
+@router.delete("/queries")
+async def reset_query_report(_=Depends(get_current_user)):
+    query_log.clear()
+    return {"ok": True}
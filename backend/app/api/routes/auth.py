@@ -1,27 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.db.session import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.deps import get_current_user, hasher_busy
+from app.db.session import get_async_session
 from app.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import HasherBusy, password_hasher, create_access_token
 from app.schemas.auth import RegisterIn, LoginIn, TokenOut
 
 router = APIRouter()
 
 @router.post("/register", response_model=TokenOut)
-def register(payload: RegisterIn, session: Session = Depends(get_session)):
-    existing = session.exec(select(User).where(User.email == payload.email)).first()
+async def register(payload: RegisterIn, session: AsyncSession = Depends(get_async_session)):
+    existing = (await session.exec(select(User).where(User.email == payload.email))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(email=payload.email, password_hash=hash_password(payload.password), name=payload.name)
+    # don't hold a pooled connection while waiting for bcrypt
+    await session.rollback()
+    try:
+        password_hash = await password_hasher.hash(payload.password)
+    except HasherBusy:
+        raise hasher_busy()
+    user = User(email=payload.email, password_hash=password_hash, name=payload.name)
     session.add(user)
-    session.commit()
+    await session.commit()
     token = create_access_token(sub=payload.email)
     return TokenOut(access_token=token)
 
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.email == payload.email)).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginIn, session: AsyncSession = Depends(get_async_session)):
+    user = (await session.exec(select(User).where(User.email == payload.email))).first()
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    user_id, stored_hash = user.id, user.password_hash
+    # don't hold a pooled connection while waiting for bcrypt
+    await session.rollback()
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(payload.password, stored_hash)
+    except HasherBusy:
+        raise hasher_busy()
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # bcrypt cost changed since this hash was made: upgrade it transparently
+        # (the rollback above expired ``user``; reload instead of lazy-loading)
+        user = await session.get(User, user_id)
+        user.password_hash = new_hash
+        session.add(user)
+        await session.commit()
     token = create_access_token(sub=payload.email)
     return TokenOut(access_token=token)
+
+@router.get("/hasher-stats")
+def hasher_stats(_=Depends(get_current_user)):
+    return password_hasher.stats()
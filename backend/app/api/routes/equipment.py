@@ -1,49 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.db.session import get_session
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.maintenance import DERIVED_FIELDS, refresh_maintenance
+from app.db.session import get_async_session, get_async_read_session
 from app.models.equipment import Equipment
+from app.models.common import READONLY_FIELDS
 from app.api.deps import get_current_user
+from app.api.facets import facet_counts
+from app.api.filters import list_filters
+from app.api.pagination import PageParams, keyset_page, page_params, page_response
+from app.api.maintenance_schedule import maintenance_schedule
+from app.api.response_cache import CachedGet, response_cache
 
 router = APIRouter()
 
+async def _refresh_maintenance(session: AsyncSession, equipment_id: int) -> None:
+    conn = await session.connection()
+    await conn.run_sync(refresh_maintenance, [equipment_id])
+
 @router.get("/", response_model=list[Equipment])
-def list_equipment(session: Session = Depends(get_session), _=Depends(get_current_user)):
-    return session.exec(select(Equipment).order_by(Equipment.name)).all()
+async def list_equipment(page: PageParams = Depends(page_params), where: list = Depends(list_filters(Equipment)), session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user), cache: CachedGet = Depends(response_cache.dependency("equipment"))):
+    if cache.hit:
+        return cache.hit
+    return cache.store(page_response(await keyset_page(session, Equipment, (Equipment.name, Equipment.id), page, where=where)))
 
 @router.post("/", response_model=Equipment)
-def create_equipment(item: Equipment, session: Session = Depends(get_session), _=Depends(get_current_user)):
+async def create_equipment(item: Equipment, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
     item.id = None
+    item.last_maintenance_on = item.next_maintenance_on = None  # derived from the strings
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await session.flush()
+    await _refresh_maintenance(session, item.id)
+    await session.commit()
+    response_cache.invalidate("equipment")
+    await session.refresh(item)
     return item
 
+@router.get("/maintenance-due")
+async def maintenance_due(
+    within_days: int = Query(30, ge=0, le=3650),
+    start: Optional[date] = Query(None, description="Window start; defaults to today"),
+    end: Optional[date] = Query(None, description="Window end; defaults to today + within_days"),
+    facility_id: Optional[int] = None,
+    _=Depends(get_current_user),
+):
+    """Overdue equipment, and equipment due between ``start`` and ``end``."""
+    today = date.today()
+    start = start or today
+    end = end or today + timedelta(days=within_days)
+    if end < start:
+        raise HTTPException(400, "end must not be before start")
+    as_of, overdue, due = await maintenance_schedule.due(start, end)
+    if facility_id is not None:
+        overdue = [r for r in overdue if r["facility_id"] == facility_id]
+        due = [r for r in due if r["facility_id"] == facility_id]
+    return {"as_of": as_of, "start": max(start, as_of), "end": end, "overdue": overdue, "due": due}
+
+@router.get("/facets")
+async def equipment_facets(request: Request, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user), cache: CachedGet = Depends(response_cache.dependency("equipment"))):
+    if cache.hit:
+        return cache.hit
+    return cache.store(await facet_counts(session, "equipment", request.query_params))
+
 @router.get("/{equipment_id}", response_model=Equipment)
-def get_equipment(equipment_id: int, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Equipment, equipment_id)
+async def get_equipment(equipment_id: int, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user), cache: CachedGet = Depends(response_cache.dependency("equipment"))):
+    if cache.hit:
+        return cache.hit
+    obj = await session.get(Equipment, equipment_id)
     if not obj:
         raise HTTPException(404, "Not found")
-    return obj
+    return cache.store(obj)
 
 @router.put("/{equipment_id}", response_model=Equipment)
-def update_equipment(equipment_id: int, item: Equipment, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Equipment, equipment_id)
+async def update_equipment(equipment_id: int, item: Equipment, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    obj = await session.get(Equipment, equipment_id)
     if not obj:
         raise HTTPException(404, "Not found")
     data = item.model_dump(exclude_unset=True)
     for k, v in data.items():
-        if k != "id":
+        if k not in READONLY_FIELDS and k not in DERIVED_FIELDS:
             setattr(obj, k, v)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.flush()
+    await _refresh_maintenance(session, equipment_id)
+    await session.commit()
+    response_cache.invalidate("equipment")
+    await session.refresh(obj)
     return obj
 
 @router.delete("/{equipment_id}")
-def delete_equipment(equipment_id: int, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Equipment, equipment_id)
+async def delete_equipment(equipment_id: int, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    obj = await session.get(Equipment, equipment_id)
     if not obj:
         raise HTTPException(404, "Not found")
-    session.delete(obj)
-    session.commit()
+    await session.delete(obj)
+    await session.commit()
+    response_cache.invalidate("equipment")
     return {"ok": True}
@@ -1,49 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.db.session import get_session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import get_async_session, get_async_read_session
 from app.models.facility import Facility
+from app.models.common import READONLY_FIELDS
 from app.api.deps import get_current_user
+from app.api.facets import facet_counts
+from app.api.filters import list_filters
+from app.api.pagination import PageParams, keyset_page, page_params, page_response
+from app.api.response_cache import CachedGet, response_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=list[Facility])
-def list_facilities(session: Session = Depends(get_session), _=Depends(get_current_user)):
-    return session.exec(select(Facility).order_by(Facility.name)).all()
+async def list_facilities(page: PageParams = Depends(page_params), where: list = Depends(list_filters(Facility)), session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user), cache: CachedGet = Depends(response_cache.dependency("facilities"))):
+    if cache.hit:
+        return cache.hit
+    return cache.store(page_response(await keyset_page(session, Facility, (Facility.name, Facility.id), page, where=where)))
 
 @router.post("/", response_model=Facility)
-def create_facility(item: Facility, session: Session = Depends(get_session), _=Depends(get_current_user)):
+async def create_facility(item: Facility, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
     item.id = None
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await session.commit()
+    response_cache.invalidate("facilities")
+    await session.refresh(item)
     return item
 
+@router.get("/facets")
+async def facility_facets(request: Request, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user), cache: CachedGet = Depends(response_cache.dependency("facilities"))):
+    if cache.hit:
+        return cache.hit
+    return cache.store(await facet_counts(session, "facilities", request.query_params))
+
 @router.get("/{facility_id}", response_model=Facility)
-def get_facility(facility_id: int, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Facility, facility_id)
+async def get_facility(facility_id: int, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user), cache: CachedGet = Depends(response_cache.dependency("facilities"))):
+    if cache.hit:
+        return cache.hit
+    obj = await session.get(Facility, facility_id)
     if not obj:
         raise HTTPException(404, "Not found")
-    return obj
+    return cache.store(obj)
 
 @router.put("/{facility_id}", response_model=Facility)
-def update_facility(facility_id: int, item: Facility, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Facility, facility_id)
+async def update_facility(facility_id: int, item: Facility, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    obj = await session.get(Facility, facility_id)
     if not obj:
         raise HTTPException(404, "Not found")
     data = item.model_dump(exclude_unset=True)
     for k, v in data.items():
-        if k != "id":
+        if k not in READONLY_FIELDS:
             setattr(obj, k, v)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.commit()
+    response_cache.invalidate("facilities")
+    await session.refresh(obj)
     return obj
 
 @router.delete("/{facility_id}")
-def delete_facility(facility_id: int, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Facility, facility_id)
+async def delete_facility(facility_id: int, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    obj = await session.get(Facility, facility_id)
     if not obj:
         raise HTTPException(404, "Not found")
-    session.delete(obj)
-    session.commit()
+    await session.delete(obj)
+    await session.commit()
+    response_cache.invalidate("facilities")
     return {"ok": True}
@@ -0,0 +1,36 @@
+import re
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.file_response import file_response
+from app.core.config import settings
+from app.core.storage import blob_path
+from app.db.session import get_async_read_session
+from app.models.attachment import Attachment
+
+# Mounted at the app root: attachment URLs are /uploads/<stored_name>
+router = APIRouter()
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+@router.api_route("/uploads/{stored_name}", methods=["GET", "HEAD"])
+async def serve_upload(stored_name: str, request: Request, session: AsyncSession = Depends(get_async_read_session)):
+    if SHA256_RE.match(stored_name):
+        path = blob_path(stored_name)
+        att = (await session.exec(select(Attachment).where(Attachment.sha256 == stored_name).limit(1))).first()
+    else:
+        # files written before the blob store existed
+        upload_dir = Path(settings.upload_dir).resolve()
+        path = (upload_dir / stored_name).resolve()
+        if path.parent != upload_dir:
+            raise HTTPException(404, "Not found")
+        att = (await session.exec(select(Attachment).where(Attachment.stored_path == str(path)).limit(1))).first()
+    if not path.is_file():
+        raise HTTPException(404, "Not found")
+    return file_response(
+        request,
+        str(path),
+        sha256=att.sha256 if att else None,
+        media_type=att.content_type if att else None,
+    )
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+import tempfile
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_user
+from app.api.response_cache import response_cache
+from app.core.config import settings
+from app.core.maintenance import refresh_maintenance
+from app.core.reagent_alerts import refresh_reagent_alerts
+from app.db.search_index import index_rows, unindex_rows
+from app.db.session import get_async_session
+from app.models.common import utcnow
+from app.models.equipment import Equipment
+from app.models.reagent import Reagent
+from app.models.registry import ENTITY_MODELS
+
+router = APIRouter()
+
+MAX_REPORTED_ERRORS = 200
+
+# derived tables to refresh for the ids a batch touched
+AFTER_UPSERT = {Reagent: refresh_reagent_alerts, Equipment: refresh_maintenance}
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+KEY_LOOKUP_CHUNK = 500
+
+
+@lru_cache
+def _row_model(model) -> type[BaseModel]:
+    """Plain pydantic twin of a table model: same validation, no ORM instrumentation per row."""
+    fields = {name: (info.annotation, info) for name, info in model.model_fields.items()}
+    return create_model(f"{model.__name__}ImportRow", __config__=ConfigDict(protected_namespaces=()), **fields)
+
+
+def _iter_ndjson(fh: BinaryIO) -> Iterator[tuple[int, dict | Exception]]:
+    for line_no, line in enumerate(codecs.getreader("utf-8-sig")(fh), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+            continue
+        yield line_no, row if isinstance(row, dict) else ValueError("row must be a JSON object")
+
+
+def _iter_csv(fh: BinaryIO) -> Iterator[tuple[int, dict | Exception]]:
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for row in reader:
+        # empty cells mean "not provided" so model defaults apply (and ints/dates stay parseable)
+        yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+
+
+def _upsert_batch(session: Session, model, rows: list[tuple[int, dict]]) -> tuple[int, int]:
+    """Insert rows, or update the given columns of rows whose id already exists.
+
+    Runs the model's ``AFTER_UPSERT`` hook on the touched ids in the same transaction,
+    and keeps an app-fed search index (``app.db.search_index``) in step.
+    """
+    ids = [data["id"] for _, data in rows if data.get("id") is not None]
+    existing = set(session.exec(select(model.id).where(model.id.in_(ids)))) if ids else set()
+
+    # executemany needs one statement per distinct set of provided columns
+    shapes: dict[tuple[str, ...], list[dict]] = {}
+    for _, data in rows:
+        provided = tuple(sorted(k for k in data["__provided__"] if k not in ("id", "created_at")))
+        shapes.setdefault(provided, []).append({k: v for k, v in data.items() if k != "__provided__"})
+
+    conn = session.connection()
+    table = model.__tablename__
+    unindex_rows(conn, table, existing)
+    now = utcnow()
+    touched: list[int] = []
+    for provided, params in shapes.items():
+        stmt = insert(model)
+        set_ = {k: stmt.excluded[k] for k in provided}
+        set_["updated_at"] = now
+        stmt = stmt.on_conflict_do_update(index_elements=["id"], set_=set_).returning(model.id)
+        touched.extend(conn.execute(stmt, params).scalars())
+    index_rows(conn, table, touched)
+    if model in AFTER_UPSERT:
+        AFTER_UPSERT[model](conn, touched)
+    return len(rows) - len(existing), len(existing)
+
+
+def _parse_key(model, key: str | None) -> list[str]:
+    names = [n.strip() for n in (key or "").split(",") if n.strip()]
+    unknown = [n for n in names if n not in model.__table__.c or n == "id"]
+    if unknown:
+        raise HTTPException(400, f"Unknown key columns: {', '.join(unknown)}")
+    return names
+
+
+def _match_keys(session: Session, model, key: list[str], rows: list[tuple[int, dict]]) -> tuple[list, list]:
+    """Give rows without an ``id`` the id of the existing row with the same ``key`` values.
+
+    Returns (rows to write, (line, error) for rows repeating a key seen earlier in the batch).
+    """
+    columns = [model.__table__.c[n] for n in key]
+    pending = list({tuple(data[n] for n in key) for _, data in rows if data.get("id") is None})
+    existing: dict[tuple, int] = {}
+    # chunked to stay under SQLite's bound-parameter limit
+    for start in range(0, len(pending), KEY_LOOKUP_CHUNK):
+        chunk = pending[start:start + KEY_LOOKUP_CHUNK]
+        found = session.exec(select(model.id, *columns).where(tuple_(*columns).in_(chunk)).order_by(model.id))
+        for row in found:
+            existing.setdefault(tuple(row[1:]), row[0])
+    keep, duplicates, first_line = [], [], {}
+    for line_no, data in rows:
+        if data.get("id") is not None:
+            keep.append((line_no, data))
+            continue
+        values = tuple(data[n] for n in key)
+        if values in first_line:
+            duplicates.append((line_no, f"same {', '.join(key)} as line {first_line[values]}"))
+            continue
+        first_line[values] = line_no
+        data["id"] = existing.get(values)
+        keep.append((line_no, data))
+    return keep, duplicates
+
+
+def _fail(report: dict, line_no: int, error) -> None:
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line_no, "error": error})
+
+
+def _next_batch(rows: Iterator[tuple[int, dict | Exception]], batch_size: int, row_model, report: dict) -> list | None:
+    """Read and validate up to ``batch_size`` rows (blocking: runs in the threadpool); None at the end."""
+    batch = list(islice(rows, batch_size))
+    if not batch:
+        return None
+    valid: list[tuple[int, dict]] = []
+    for line_no, raw in batch:
+        report["processed"] += 1
+        if isinstance(raw, Exception):
+            _fail(report, line_no, str(raw))
+            continue
+        try:
+            obj = row_model.model_validate(raw)
+        except ValidationError as e:
+            _fail(report, line_no, e.errors(include_url=False, include_context=False))
+            continue
+        data = obj.model_dump()
+        data["__provided__"] = obj.model_fields_set
+        valid.append((line_no, data))
+    return valid
+
+
+async def _import(session: AsyncSession, model, rows: Iterator[tuple[int, dict | Exception]], batch_size: int, key: list[str]) -> dict:
+    report = {"processed": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+    row_model = _row_model(model)
+    while (valid := await run_in_threadpool(_next_batch, rows, batch_size, row_model, report)) is not None:
+        if key:
+            valid, duplicates = await session.run_sync(_match_keys, model, key, valid)
+            for line_no, error in duplicates:
+                _fail(report, line_no, error)
+        if not valid:
+            continue
+        try:
+            inserted, updated = await session.run_sync(_upsert_batch, model, valid)
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            for line_no, _ in valid:
+                _fail(report, line_no, f"batch rejected by database: {e.orig or e}")
+            continue
+        report["inserted"] += inserted
+        report["updated"] += updated
+    return report
+
+
+@router.post("/{entity}")
+async def import_rows(
+    entity: str,
+    request: Request,
+    format: str | None = Query(None, pattern="^(ndjson|csv)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    key: str | None = Query(None, description="Comma-separated columns that identify an existing row, e.g. name,lot_no"),
+    session: AsyncSession = Depends(get_async_session),
+    _=Depends(get_current_user),
+):
+    """Bulk upsert NDJSON or CSV rows; rows with an existing ``id`` are updated.
+
+    Rows without an ``id`` are inserted, unless ``key`` names columns to match
+    on: ``?key=name,lot_no`` updates the existing row with the same name and
+    lot number (the first one, if several match), so re-importing a
+    spreadsheet without ids does not duplicate it. Within one batch a
+    repeated key is reported as an error.
+
+    The body is spooled to a temp file (memory stays bounded) and processed in
+    ``batch_size`` chunks: each is read and validated in the threadpool, then
+    written as one transaction on the async writer.
+    """
+    model = ENTITY_MODELS.get(entity)
+    if model is None:
+        raise HTTPException(404, "Unknown entity")
+    key_columns = _parse_key(model, key)
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if settings.max_upload_bytes and size > settings.max_upload_bytes:
+                raise HTTPException(413, f"Body exceeds {settings.max_upload_bytes} bytes")
+            await run_in_threadpool(spool.write, chunk)
+        spool.seek(0)
+        rows = _iter_csv(spool) if format == "csv" else _iter_ndjson(spool)
+        report = await _import(session, model, rows, batch_size, key_columns)
+    finally:
+        spool.close()
+    if report["inserted"] or report["updated"]:
+        response_cache.invalidate(entity)
+    return {"entity": entity, "format": format, **report}
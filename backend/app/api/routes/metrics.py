@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+from app.core.metrics import CONTENT_TYPE, Gauge, registry
+from app.core.security import password_hasher
+
+# Mounted at the app root: Prometheus scrapes /metrics
+router = APIRouter()
+
+for _key, _help in (
+    ("running", "bcrypt jobs running in the hash workers"),
+    ("queue_depth", "Logins waiting for a hash worker"),
+    ("completed", "bcrypt jobs completed since start"),
+    ("rejected", "Logins rejected with 503 because the hash queue was full"),
+):
+    registry.register(Gauge(f"password_hasher_{_key}", _help, source=lambda key=_key: password_hasher.stats()[key]))
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,49 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.db.session import get_session
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.reagent_alerts import DERIVED_FIELDS, EXPIRY, LOW_STOCK, refresh_reagent_alerts
+from app.db.session import get_async_session, get_async_read_session
 from app.models.reagent import Reagent
+from app.models.reagent_alert import ReagentAlert
+from app.models.common import READONLY_FIELDS
 from app.api.deps import get_current_user
+from app.api.facets import facet_counts
+from app.api.filters import list_filters
+from app.api.pagination import PageParams, keyset_page, page_params, page_response
 
 router = APIRouter()
 
+# what the morning inventory check needs; skips the markdown bodies
+ALERT_FIELDS = ("id", "name", "cat_no", "lot_no", "storage_location", "storage_temp",
+                "expiry_date", "expiry_on", "stock_status", "qty_est", "min_stock")
+
+async def _refresh_alerts(session: AsyncSession, reagent_id: int) -> None:
+    conn = await session.connection()
+    await conn.run_sync(refresh_reagent_alerts, [reagent_id])
+
 @router.get("/", response_model=list[Reagent])
-def list_reagents(session: Session = Depends(get_session), _=Depends(get_current_user)):
-    return session.exec(select(Reagent).order_by(Reagent.name)).all()
+async def list_reagents(page: PageParams = Depends(page_params), where: list = Depends(list_filters(Reagent)), session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user)):
+    return page_response(await keyset_page(session, Reagent, (Reagent.name, Reagent.id), page, where=where))
 
 @router.post("/", response_model=Reagent)
-def create_reagent(item: Reagent, session: Session = Depends(get_session), _=Depends(get_current_user)):
+async def create_reagent(item: Reagent, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
     item.id = None
+    item.expiry_on = item.opened_on = None  # derived from the strings below
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await session.flush()
+    await _refresh_alerts(session, item.id)
+    await session.commit()
+    await session.refresh(item)
     return item
 
+@router.get("/alerts")
+async def reagent_alerts(
+    within_days: int = Query(30, ge=0, le=3650),
+    session: AsyncSession = Depends(get_async_read_session),
+    _=Depends(get_current_user),
+):
+    """Expired, expiring within ``within_days`` and low-stock reagents."""
+    today = date.today()
+    cols = [Reagent.__table__.c[f] for f in ALERT_FIELDS]
+    expiring = (await session.exec(
+        select(*cols)
+        .join(ReagentAlert, ReagentAlert.reagent_id == Reagent.id)
+        .where(ReagentAlert.kind == EXPIRY, ReagentAlert.due_on <= today + timedelta(days=within_days))
+        .order_by(ReagentAlert.due_on, Reagent.id)
+    )).all()
+    low_stock = (await session.exec(
+        select(*cols)
+        .join(ReagentAlert, ReagentAlert.reagent_id == Reagent.id)
+        .where(ReagentAlert.kind == LOW_STOCK)
+        .order_by(Reagent.name, Reagent.id)
+    )).all()
+    return {
+        "as_of": today,
+        "within_days": within_days,
+        "expired": [r._asdict() for r in expiring if r.expiry_on < today],
+        "expiring": [r._asdict() for r in expiring if r.expiry_on >= today],
+        "low_stock": [r._asdict() for r in low_stock],
+    }
+
+@router.get("/facets")
+async def reagent_facets(request: Request, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user)):
+    return await facet_counts(session, "reagents", request.query_params)
+
 @router.get("/{reagent_id}", response_model=Reagent)
-def get_reagent(reagent_id: int, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Reagent, reagent_id)
+async def get_reagent(reagent_id: int, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user)):
+    obj = await session.get(Reagent, reagent_id)
     if not obj:
         raise HTTPException(404, "Not found")
     return obj
 
 @router.put("/{reagent_id}", response_model=Reagent)
-def update_reagent(reagent_id: int, item: Reagent, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Reagent, reagent_id)
+async def update_reagent(reagent_id: int, item: Reagent, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    obj = await session.get(Reagent, reagent_id)
     if not obj:
         raise HTTPException(404, "Not found")
     data = item.model_dump(exclude_unset=True)
     for k, v in data.items():
-        if k != "id":
+        if k not in READONLY_FIELDS and k not in DERIVED_FIELDS:
             setattr(obj, k, v)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.flush()
+    await _refresh_alerts(session, reagent_id)
+    await session.commit()
+    await session.refresh(obj)
     return obj
 
 @router.delete("/{reagent_id}")
-def delete_reagent(reagent_id: int, session: Session = Depends(get_session), _=Depends(get_current_user)):
-    obj = session.get(Reagent, reagent_id)
+async def delete_reagent(reagent_id: int, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    obj = await session.get(Reagent, reagent_id)
     if not obj:
         raise HTTPException(404, "Not found")
-    session.delete(obj)
-    session.commit()
+    await session.delete(obj)
+    await session.flush()
+    await _refresh_alerts(session, reagent_id)
+    await session.commit()
     return {"ok": True}
@@ -1,102 +1,215 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, delete
-
-from app.db.session import get_session
+from collections import defaultdict
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import bindparam, insert, update
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.facets import facet_counts
+from app.api.filters import list_filters
+from app.api.json_response import list_columns, row_dicts
+from app.api.pagination import PageParams, keyset_page, page_params, page_response
+from app.api.routes.uploads import attachment_out
+from app.db.session import get_async_session, get_async_read_session
+from app.models.attachment import Attachment
+from app.models.common import READONLY_FIELDS, utcnow
+from app.models.equipment import Equipment
 from app.models.experiment_record import ExperimentRecord
+from app.models.experiment_template import ExperimentTemplate
 from app.models.link_tables import RecordEquipmentLink, RecordReagentLink
+from app.models.reagent import Reagent
+from app.models.sop import SOP
+from app.schemas.records import BulkLinksIn, RecordFullOut
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[ExperimentRecord])
-def list_records(session: Session = Depends(get_session)):
-    return session.exec(select(ExperimentRecord).order_by(ExperimentRecord.id.desc())).all()
+async def list_records(page: PageParams = Depends(page_params), where: list = Depends(list_filters(ExperimentRecord)), session: AsyncSession = Depends(get_async_read_session)):
+    return page_response(await keyset_page(session, ExperimentRecord, (ExperimentRecord.id,), page, descending=True, where=where))
+
+
+@router.get("/facets")
+async def record_facets(request: Request, session: AsyncSession = Depends(get_async_read_session)):
+    return await facet_counts(session, "records", request.query_params)
 
 
 @router.get("/{record_id}", response_model=ExperimentRecord)
-def get_record(record_id: int, session: Session = Depends(get_session)):
-    obj = session.get(ExperimentRecord, record_id)
+async def get_record(record_id: int, session: AsyncSession = Depends(get_async_read_session)):
+    obj = await session.get(ExperimentRecord, record_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Record not found")
     return obj
 
 
 @router.post("/", response_model=ExperimentRecord)
-def create_record(payload: ExperimentRecord, session: Session = Depends(get_session)):
-    data = payload.model_dump(exclude={"id"})
+async def create_record(payload: ExperimentRecord, session: AsyncSession = Depends(get_async_session)):
+    data = payload.model_dump(exclude=READONLY_FIELDS)
     obj = ExperimentRecord(**data)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.commit()
+    await session.refresh(obj)
     return obj
 
 
 @router.put("/{record_id}", response_model=ExperimentRecord)
-def update_record(record_id: int, payload: ExperimentRecord, session: Session = Depends(get_session)):
-    obj = session.get(ExperimentRecord, record_id)
+async def update_record(record_id: int, payload: ExperimentRecord, session: AsyncSession = Depends(get_async_session)):
+    obj = await session.get(ExperimentRecord, record_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Record not found")
-    data = payload.model_dump(exclude={"id"})
+    data = payload.model_dump(exclude=READONLY_FIELDS)
     for k, v in data.items():
         setattr(obj, k, v)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.commit()
+    await session.refresh(obj)
     return obj
 
 
 @router.delete("/{record_id}")
-def delete_record(record_id: int, session: Session = Depends(get_session)):
-    obj = session.get(ExperimentRecord, record_id)
+async def delete_record(record_id: int, session: AsyncSession = Depends(get_async_session)):
+    obj = await session.get(ExperimentRecord, record_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Record not found")
-    session.delete(obj)
-    session.commit()
-    # also cleanup links
-    session.exec(delete(RecordEquipmentLink).where(RecordEquipmentLink.record_id == record_id))
-    session.exec(delete(RecordReagentLink).where(RecordReagentLink.record_id == record_id))
-    session.commit()
+    # links and record go in one transaction: no orphaned links if the commit fails
+    await session.exec(delete(RecordEquipmentLink).where(RecordEquipmentLink.record_id == record_id))
+    await session.exec(delete(RecordReagentLink).where(RecordReagentLink.record_id == record_id))
+    await session.delete(obj)
+    await session.commit()
     return {"ok": True}
 
 
 # ---------- Link helpers used by Flutter ----------
 
 @router.get("/{record_id}/equipment-ids")
-def get_equipment_ids(record_id: int, session: Session = Depends(get_session)):
-    links = session.exec(select(RecordEquipmentLink).where(RecordEquipmentLink.record_id == record_id)).all()
+async def get_equipment_ids(record_id: int, session: AsyncSession = Depends(get_async_read_session)):
+    links = (await session.exec(select(RecordEquipmentLink).where(RecordEquipmentLink.record_id == record_id))).all()
     return {"ids": [l.equipment_id for l in links]}
 
 
 @router.get("/{record_id}/reagent-ids")
-def get_reagent_ids(record_id: int, session: Session = Depends(get_session)):
-    links = session.exec(select(RecordReagentLink).where(RecordReagentLink.record_id == record_id)).all()
+async def get_reagent_ids(record_id: int, session: AsyncSession = Depends(get_async_read_session)):
+    links = (await session.exec(select(RecordReagentLink).where(RecordReagentLink.record_id == record_id))).all()
     return {"ids": [l.reagent_id for l in links]}
 
 
-@router.post("/{record_id}/set-equipment")
-def set_equipment_ids(record_id: int, payload: dict, session: Session = Depends(get_session)):
-    ids = payload.get("ids") or []
+@router.get("/{record_id}/full", response_model=RecordFullOut)
+async def get_record_full(record_id: int, session: AsyncSession = Depends(get_async_read_session)):
+    """Everything the record detail screen needs, in at most six queries.
+
+    Linked items come list-shaped, without their compressed markdown bodies
+    (``GET /{entity}/{id}`` has those), so only the record itself is decompressed.
+    """
+    record = await session.get(ExperimentRecord, record_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Record not found")
+    equipment = await _list_rows(
+        session, Equipment,
+        Equipment.id.in_(select(RecordEquipmentLink.equipment_id).where(RecordEquipmentLink.record_id == record_id)),
+        order_by=(Equipment.name, Equipment.id),
+    )
+    reagents = await _list_rows(
+        session, Reagent,
+        Reagent.id.in_(select(RecordReagentLink.reagent_id).where(RecordReagentLink.record_id == record_id)),
+        order_by=(Reagent.name, Reagent.id),
+    )
+    attachments = (await session.exec(
+        select(Attachment).where(Attachment.entity_type == "record", Attachment.entity_id == record_id)
+    )).all()
+    sop = await _list_rows(session, SOP, SOP.id == record.sop_id) if record.sop_id else []
+    template = await _list_rows(session, ExperimentTemplate, ExperimentTemplate.id == record.template_id) if record.template_id else []
+    return RecordFullOut(
+        record=record,
+        equipment=equipment,
+        reagents=reagents,
+        attachments=[attachment_out(a) for a in attachments],
+        sop=sop[0] if sop else None,
+        template=template[0] if template else None,
+    )
+
+
+async def _list_rows(session: AsyncSession, model, *where, order_by=()) -> list[dict]:
+    columns = list_columns(model)
+    rows = (await session.exec(select(*columns).where(*where).order_by(*order_by))).all()
+    return row_dicts(rows, (c.name for c in columns))
+
+
+def _parse_ids(ids) -> list[int]:
     if not isinstance(ids, list):
         raise HTTPException(status_code=400, detail="ids must be a list")
-    # clear then insert
-    session.exec(delete(RecordEquipmentLink).where(RecordEquipmentLink.record_id == record_id))
-    session.commit()
-    for eid in ids:
-        session.add(RecordEquipmentLink(record_id=record_id, equipment_id=int(eid)))
-    session.commit()
-    return {"ok": True, "count": len(ids)}
+    try:
+        return list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="ids must be integers")
+
+
+async def _sync_links(session: AsyncSession, link_model, target: str, wanted: dict[int, list[int]]) -> tuple[int, int]:
+    """Make each record's links equal ``wanted[record_id]`` by inserting/deleting only the difference.
+
+    Runs as executemany statements in the caller's transaction; returns (added, removed).
+    """
+    target_col = getattr(link_model, target)
+    existing: dict[int, set[int]] = defaultdict(set)
+    rows = await session.exec(select(link_model.record_id, target_col).where(link_model.record_id.in_(list(wanted))))
+    for record_id, target_id in rows:
+        existing[record_id].add(target_id)
+
+    to_add = [
+        {"record_id": record_id, target: target_id}
+        for record_id, ids in wanted.items()
+        for target_id in ids
+        if target_id not in existing[record_id]
+    ]
+    to_remove = [
+        {"rid": record_id, "tid": target_id}
+        for record_id, ids in wanted.items()
+        for target_id in existing[record_id] - set(ids)
+    ]
+    conn = await session.connection()
+    if to_remove:
+        stmt = delete(link_model).where(link_model.record_id == bindparam("rid"), target_col == bindparam("tid"))
+        await conn.execute(stmt, to_remove)
+    if to_add:
+        await conn.execute(insert(link_model), to_add)
+    changed = {p["record_id"] for p in to_add} | {p["rid"] for p in to_remove}
+    if changed:
+        # links are part of what /sync reports for a record
+        await conn.execute(update(ExperimentRecord).where(ExperimentRecord.id.in_(changed)).values(updated_at=utcnow()))
+    return len(to_add), len(to_remove)
+
+
+@router.post("/set-links")
+async def set_links_bulk(payload: BulkLinksIn, session: AsyncSession = Depends(get_async_session)):
+    """Set equipment/reagent links for many records in one transaction.
+
+    Omitting ``equipment_ids`` or ``reagent_ids`` for a record leaves those links as they are.
+    """
+    equipment = {i.record_id: list(dict.fromkeys(i.equipment_ids)) for i in payload.items if i.equipment_ids is not None}
+    reagents = {i.record_id: list(dict.fromkeys(i.reagent_ids)) for i in payload.items if i.reagent_ids is not None}
+    eq_added, eq_removed = await _sync_links(session, RecordEquipmentLink, "equipment_id", equipment) if equipment else (0, 0)
+    rg_added, rg_removed = await _sync_links(session, RecordReagentLink, "reagent_id", reagents) if reagents else (0, 0)
+    await session.commit()
+    return {
+        "ok": True,
+        "records": len(payload.items),
+        "equipment": {"added": eq_added, "removed": eq_removed},
+        "reagents": {"added": rg_added, "removed": rg_removed},
+    }
+
+
+@router.post("/{record_id}/set-equipment")
+async def set_equipment_ids(record_id: int, payload: dict, session: AsyncSession = Depends(get_async_session)):
+    ids = _parse_ids(payload.get("ids") or [])
+    added, removed = await _sync_links(session, RecordEquipmentLink, "equipment_id", {record_id: ids})
+    await session.commit()
+    return {"ok": True, "count": len(ids), "added": added, "removed": removed}
 
 
 @router.post("/{record_id}/set-reagents")
-def set_reagent_ids(record_id: int, payload: dict, session: Session = Depends(get_session)):
-    ids = payload.get("ids") or []
-    if not isinstance(ids, list):
-        raise HTTPException(status_code=400, detail="ids must be a list")
-    session.exec(delete(RecordReagentLink).where(RecordReagentLink.record_id == record_id))
-    session.commit()
-    for rid in ids:
-        session.add(RecordReagentLink(record_id=record_id, reagent_id=int(rid)))
-    session.commit()
-    return {"ok": True, "count": len(ids)}
+async def set_reagent_ids(record_id: int, payload: dict, session: AsyncSession = Depends(get_async_session)):
+    ids = _parse_ids(payload.get("ids") or [])
+    added, removed = await _sync_links(session, RecordReagentLink, "reagent_id", {record_id: ids})
+    await session.commit()
+    return {"ok": True, "count": len(ids), "added": added, "removed": removed}
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select, or_
-from app.db.session import get_session
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.session import get_async_read_session
+from app.db.search_index import highlights, match_expression, search_ids
 from app.models.equipment import Equipment
 from app.models.facility import Facility
 from app.models.reagent import Reagent
@@ -9,26 +12,42 @@ from app.api.deps import get_current_user
 
 router = APIRouter()
 
-def like(q: str) -> str:
-    return f"%{q}%"
+MODELS = {
+    "equipment": Equipment,
+    "facilities": Facility,
+    "reagents": Reagent,
+    "records": ExperimentRecord,
+}
 
-@router.get("/")
-def search(q: str, type: str = "all", session: Session = Depends(get_session), _=Depends(get_current_user)):
-    q = q.strip()
-    if not q:
+# stdlib json: bm25 scores can be tiny floats, which orjson would write as 1e-6 rather than 1e-06
+@router.get("/", response_class=JSONResponse)
+async def search(
+    q: str,
+    type: str = "all",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_async_read_session),
+    _=Depends(get_current_user),
+):
+    match = match_expression(q.strip())
+    if not match:
         return {"equipment": [], "facilities": [], "reagents": [], "records": []}
 
     results = {}
-    if type in ("all","equipment"):
-        rows = session.exec(select(Equipment).where(or_(Equipment.name.like(like(q)), Equipment.tags.like(like(q)), Equipment.asset_no.like(like(q))))).all()
-        results["equipment"] = rows
-    if type in ("all","facilities"):
-        rows = session.exec(select(Facility).where(or_(Facility.name.like(like(q)), Facility.tags.like(like(q)), Facility.location.like(like(q))))).all()
-        results["facilities"] = rows
-    if type in ("all","reagents"):
-        rows = session.exec(select(Reagent).where(or_(Reagent.name.like(like(q)), Reagent.tags.like(like(q)), Reagent.cat_no.like(like(q)), Reagent.lot_no.like(like(q))))).all()
-        results["reagents"] = rows
-    if type in ("all","records"):
-        rows = session.exec(select(ExperimentRecord).where(or_(ExperimentRecord.title.like(like(q)), ExperimentRecord.tags.like(like(q)), ExperimentRecord.purpose.like(like(q))))).all()
-        results["records"] = rows
+    conn = await session.connection()
+    for key, model in MODELS.items():
+        if type not in ("all", key):
+            continue
+        hits = await conn.run_sync(search_ids, key, match, limit, offset)
+        ids = [h["id"] for h in hits]
+        found = (await session.exec(select(model).where(model.id.in_(ids)))).all() if ids else []
+        rows = {r.id: r.model_dump() for r in found}
+        # the contentless indexes keep no text: mark up the hits from their decompressed rows
+        marks = highlights(key, match, rows.values())
+        # keep BM25 order; rows deleted between the two queries are skipped
+        results[key] = [
+            {**rows[h["id"]], "score": h["score"], **marks.get(h["id"], {"highlight": None, "snippet": None})}
+            for h in hits
+            if h["id"] in rows
+        ]
     return results
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_current_user
+from app.api.json_response import FastJSONResponse, row_columns, row_dicts
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.config import settings
+from app.db.session import get_async_read_session
+from app.models.common import utcnow
+from app.models.registry import ENTITY_MODELS
+from app.models.tombstone import Tombstone
+
+router = APIRouter()
+
+TOMBSTONES = "_deleted"  # cursor slot for the tombstone log
+
+Position = tuple[datetime, int]
+
+
+def _decode_positions(since: str) -> dict[str, Position]:
+    positions = {}
+    for item in decode_cursor(since):
+        try:
+            source, ts, row_id = item
+            positions[source] = (datetime.fromisoformat(ts), int(row_id))
+        except (TypeError, ValueError):
+            raise HTTPException(400, "Invalid cursor")
+    return positions
+
+
+def _encode_positions(positions: dict[str, Position]) -> str:
+    return encode_cursor([[source, ts.isoformat(), row_id] for source, (ts, row_id) in positions.items()])
+
+
+async def _changed(session: AsyncSession, ts_col, id_col, stmt, position: Optional[Position], horizon: datetime, limit: int):
+    stmt = stmt.where(ts_col <= horizon)
+    if position is not None:
+        stmt = stmt.where(tuple_(ts_col, id_col) > tuple_(*position))
+    rows = (await session.exec(stmt.order_by(ts_col, id_col).limit(limit + 1))).all()
+    return rows[:limit], len(rows) > limit
+
+
+@router.get("/")
+async def sync(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=5000, description="Max rows per entity (and tombstones) in one response"),
+    session: AsyncSession = Depends(get_async_read_session),
+    _=Depends(get_current_user),
+):
+    """Rows created, updated or deleted since ``since``, across all entities.
+
+    Each entity (and the tombstone log) advances its own ``(updated_at, id)``
+    keyset position inside the cursor. Rows newer than
+    ``settings.sync_settle_seconds`` are held back until a later call, so a
+    transaction that commits slightly after stamping ``updated_at`` is never
+    skipped. A row may be sent twice, so clients should upsert. Within one
+    response, apply ``deleted`` before ``changes``. While ``has_more`` is true,
+    call again with the new cursor.
+    """
+    now = utcnow().replace(tzinfo=None)  # SQLite holds naive UTC
+    horizon = now - timedelta(seconds=settings.sync_settle_seconds)
+    positions = _decode_positions(since) if since else {}
+    if since and positions.get(TOMBSTONES, (now, 0))[0] < now - timedelta(days=settings.tombstone_retention_days):
+        raise HTTPException(410, "Cursor too old; deletions were pruned. Sync again without since.")
+
+    next_positions: dict[str, Position] = {}
+    changes: dict[str, list] = {}
+    has_more = False
+    for entity, model in ENTITY_MODELS.items():
+        columns = row_columns(model)
+        rows, more = await _changed(
+            session, model.updated_at, model.id, select(*columns), positions.get(entity), horizon, limit
+        )
+        if rows:
+            # plain rows, encoded as they come: sync pages are the largest responses we send
+            changes[entity] = row_dicts(rows, (c.name for c in columns))
+        has_more |= more
+        # a source that is drained is complete up to the horizon
+        next_positions[entity] = (rows[-1].updated_at, rows[-1].id) if more else (horizon, 0)
+
+    deleted: dict[str, list[int]] = {}
+    if since:
+        tombstones, more = await _changed(
+            session, Tombstone.deleted_at, Tombstone.id, select(Tombstone), positions.get(TOMBSTONES), horizon, limit
+        )
+        has_more |= more
+        next_positions[TOMBSTONES] = (tombstones[-1].deleted_at, tombstones[-1].id) if more else (horizon, 0)
+        by_entity: dict[str, set[int]] = defaultdict(set)
+        for t in tombstones:
+            by_entity[t.entity].add(t.entity_id)
+        for entity, ids in by_entity.items():
+            model = ENTITY_MODELS.get(entity)
+            if model is None:
+                continue
+            # SQLite may reuse the id of a deleted row; a live row wins over its old tombstone
+            alive = set((await session.exec(select(model.id).where(model.id.in_(ids)))).all())
+            if ids - alive:
+                deleted[entity] = sorted(ids - alive)
+    else:
+        # a full sync already reflects every deletion
+        next_positions[TOMBSTONES] = (horizon, 0)
+
+    return FastJSONResponse({
+        "cursor": _encode_positions(next_positions),
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": deleted,
+    })
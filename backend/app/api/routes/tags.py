@@ -0,0 +1,26 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.deps import get_current_user
+from app.db.session import get_async_read_session
+from app.models.tag import TAG_LINKS, Tag, TagCount
+
+router = APIRouter()
+
+@router.get("/facets")
+async def tag_facets(entity: Optional[str] = None, session: AsyncSession = Depends(get_async_read_session), _=Depends(get_current_user)):
+    """Tag counts per entity type, most used first: ``{"records": [{"tag": "qPCR", "count": 12}, ...], ...}``.
+
+    Read from ``tagcount``, which the link-table triggers keep current (app.db.tags).
+    """
+    if entity is not None and entity not in TAG_LINKS:
+        raise HTTPException(404, "Unknown entity")
+    stmt = select(TagCount.entity, Tag.name, TagCount.count).join(Tag, Tag.id == TagCount.tag_id)
+    if entity is not None:
+        stmt = stmt.where(TagCount.entity == entity)
+    rows = (await session.exec(stmt.order_by(TagCount.entity, TagCount.count.desc(), Tag.name))).all()
+    facets = {name: [] for name in TAG_LINKS if entity in (None, name)}
+    for name, tag, count in rows:
+        facets[name].append({"tag": tag, "count": count})
+    return facets
@@ -1,57 +1,77 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
+from app.api.facets import facet_counts
+from app.api.filters import list_filters
+from app.api.pagination import PageParams, keyset_page, page_params, page_response
+from app.api.response_cache import CachedGet, response_cache
+from app.db.session import get_async_session, get_async_read_session
+from app.models.common import READONLY_FIELDS
 from app.models.experiment_template import ExperimentTemplate
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[ExperimentTemplate])
-def list_templates(session: Session = Depends(get_session)):
-    return session.exec(select(ExperimentTemplate).order_by(ExperimentTemplate.id.desc())).all()
+async def list_templates(page: PageParams = Depends(page_params), where: list = Depends(list_filters(ExperimentTemplate)), session: AsyncSession = Depends(get_async_read_session), cache: CachedGet = Depends(response_cache.dependency("templates"))):
+    if cache.hit:
+        return cache.hit
+    return cache.store(page_response(await keyset_page(session, ExperimentTemplate, (ExperimentTemplate.id,), page, descending=True, where=where)))
+
+
+@router.get("/facets")
+async def template_facets(request: Request, session: AsyncSession = Depends(get_async_read_session), cache: CachedGet = Depends(response_cache.dependency("templates"))):
+    if cache.hit:
+        return cache.hit
+    return cache.store(await facet_counts(session, "templates", request.query_params))
 
 
 @router.get("/{template_id}", response_model=ExperimentTemplate)
-def get_template(template_id: int, session: Session = Depends(get_session)):
-    obj = session.get(ExperimentTemplate, template_id)
+async def get_template(template_id: int, session: AsyncSession = Depends(get_async_read_session), cache: CachedGet = Depends(response_cache.dependency("templates"))):
+    if cache.hit:
+        return cache.hit
+    obj = await session.get(ExperimentTemplate, template_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Template not found")
-    return obj
+    return cache.store(obj)
 
 
 @router.post("/", response_model=ExperimentTemplate)
-def create_template(payload: ExperimentTemplate, session: Session = Depends(get_session)):
+async def create_template(payload: ExperimentTemplate, session: AsyncSession = Depends(get_async_session)):
     # Ensure id not forced
-    data = payload.model_dump(exclude={"id"})
+    data = payload.model_dump(exclude=READONLY_FIELDS)
     obj = ExperimentTemplate(**data)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.commit()
+    response_cache.invalidate("templates")
+    await session.refresh(obj)
     return obj
 
 
 @router.put("/{template_id}", response_model=ExperimentTemplate)
-def update_template(template_id: int, payload: ExperimentTemplate, session: Session = Depends(get_session)):
-    obj = session.get(ExperimentTemplate, template_id)
+async def update_template(template_id: int, payload: ExperimentTemplate, session: AsyncSession = Depends(get_async_session)):
+    obj = await session.get(ExperimentTemplate, template_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Template not found")
-    data = payload.model_dump(exclude={"id"})
+    data = payload.model_dump(exclude=READONLY_FIELDS)
     for k, v in data.items():
         setattr(obj, k, v)
     session.add(obj)
-    session.commit()
-    session.refresh(obj)
+    await session.commit()
+    response_cache.invalidate("templates")
+    await session.refresh(obj)
     return obj
 
 
 @router.delete("/{template_id}")
-def delete_template(template_id: int, session: Session = Depends(get_session)):
-    obj = session.get(ExperimentTemplate, template_id)
+async def delete_template(template_id: int, session: AsyncSession = Depends(get_async_session)):
+    obj = await session.get(ExperimentTemplate, template_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Template not found")
-    session.delete(obj)
-    session.commit()
+    await session.delete(obj)
+    await session.commit()
+    response_cache.invalidate("templates")
     return {"ok": True}
@@ -1,65 +1,118 @@
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
-from sqlmodel import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pathlib import Path
-import uuid
-from app.core.config import settings
-from app.db.session import get_session
+from app.core.storage import UploadTooLarge, acquire_blob, acquire_existing_blob, blob_path, blob_root, receive_blob, release_blob
+from app.db.session import get_async_session, get_async_read_session
 from app.models.attachment import Attachment
 from app.api.deps import get_current_user
 
 router = APIRouter()
 
+ENTITY_TYPES = {"equipment","facility","reagent","record","sop","template"}
+
+def attachment_out(att: Attachment) -> dict:
+    stored_name = Path(att.stored_path).name
+    return {
+        "id": att.id,
+        "filename": att.filename,
+        "url": f"/uploads/{stored_name}",
+        "note": att.note,
+        "sha256": att.sha256,
+        "size_bytes": att.size_bytes,
+    }
+
 @router.post("/")
 async def upload_file(
     entity_type: str,
     entity_id: int,
     note: str = "",
     file: UploadFile = File(...),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     _=Depends(get_current_user),
 ):
-    if entity_type not in {"equipment","facility","reagent","record","sop","template"}:
+    if entity_type not in ENTITY_TYPES:
         raise HTTPException(400, "Invalid entity_type")
-    upload_dir = Path(settings.upload_dir)
-    upload_dir.mkdir(parents=True, exist_ok=True)
 
-    ext = Path(file.filename).suffix
-    stored_name = f"{entity_type}_{entity_id}_{uuid.uuid4().hex}{ext}"
-    stored_path = upload_dir / stored_name
-
-    content = await file.read()
-    stored_path.write_bytes(content)
+    try:
+        upload = await receive_blob(file)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    stored = await session.run_sync(acquire_blob, upload)
 
     att = Attachment(
         entity_type=entity_type,
         entity_id=entity_id,
         filename=file.filename,
         content_type=file.content_type or "",
-        stored_path=str(stored_path),
+        stored_path=str(stored.path),
+        sha256=stored.sha256,
+        size_bytes=stored.size_bytes,
         note=note,
     )
     session.add(att)
-    session.commit()
-    session.refresh(att)
+    await session.commit()
+    await session.refresh(att)
+    return attachment_out(att)
 
-    return {
-        "id": att.id,
-        "filename": att.filename,
-        "url": f"/uploads/{stored_name}",
-        "note": att.note,
-    }
+@router.post("/by-hash")
+async def attach_existing(
+    entity_type: str,
+    entity_id: int,
+    sha256: str,
+    filename: str,
+    content_type: str = "",
+    note: str = "",
+    session: AsyncSession = Depends(get_async_session),
+    _=Depends(get_current_user),
+):
+    """Attach a file the server already stores, without sending its bytes.
+
+    Clients hash the file locally and try this first; 404 means "upload it".
+    """
+    if entity_type not in ENTITY_TYPES:
+        raise HTTPException(400, "Invalid entity_type")
+    sha256 = sha256.lower()
+    blob = await session.run_sync(acquire_existing_blob, sha256)
+    if blob is None:
+        await session.rollback()
+        raise HTTPException(404, "Unknown blob")
+    att = Attachment(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        filename=filename,
+        content_type=content_type,
+        stored_path=str(blob_path(sha256)),
+        sha256=sha256,
+        size_bytes=blob.size_bytes,
+        note=note,
+    )
+    session.add(att)
+    await session.commit()
+    await session.refresh(att)
+    return attachment_out(att)
 
 @router.get("/{entity_type}/{entity_id}")
-def list_attachments(
+async def list_attachments(
     entity_type: str,
     entity_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
     _=Depends(get_current_user),
 ):
-    from sqlmodel import select
-    rows = session.exec(select(Attachment).where(Attachment.entity_type==entity_type, Attachment.entity_id==entity_id)).all()
-    out = []
-    for r in rows:
-        stored_name = Path(r.stored_path).name
-        out.append({"id": r.id, "filename": r.filename, "url": f"/uploads/{stored_name}", "note": r.note})
-    return out
+    rows = (await session.exec(select(Attachment).where(Attachment.entity_type==entity_type, Attachment.entity_id==entity_id))).all()
+    return [attachment_out(r) for r in rows]
+
+@router.delete("/{attachment_id}")
+async def delete_attachment(attachment_id: int, session: AsyncSession = Depends(get_async_session), _=Depends(get_current_user)):
+    att = await session.get(Attachment, attachment_id)
+    if not att:
+        raise HTTPException(404, "Not found")
+    await session.delete(att)
+    await session.flush()
+    if Path(att.stored_path).is_relative_to(blob_root()):
+        await session.run_sync(release_blob, att.sha256)
+        await session.commit()
+    else:
+        await session.commit()
+        Path(att.stored_path).unlink(missing_ok=True)  # pre-blob-store upload, owned by this row alone
+    return {"ok": True}
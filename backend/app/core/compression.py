@@ -0,0 +1,101 @@
+"""zstd compression for large text columns (``CompressedText``).
+
+Bodies are mostly near-copies of a few templates, so they are compressed
+against a shared dictionary (``app.db.compression`` builds it from the
+existing rows and keeps it in the ``zstddictionary`` table). Stored value:
+
+    1 byte format version | 4 bytes dictionary key (little endian, 0 = none) | zstd frame
+
+Values shorter than ``settings.compress_min_bytes`` stay plain TEXT, and so do
+rows written before compression existed; reads accept both. SQLite keeps the
+blobs in the same TEXT-declared column, so no table rewrite is needed.
+Decompression happens in the column's result processor, so it only runs for
+queries that actually select the column. List pages and the linked items of
+``/records/{id}/full`` leave these columns out (``list_columns``), and so do
+exports with ``fields=``, alerts and the maintenance board; single-item reads,
+/sync and /search decompress what they return.
+"""
+from __future__ import annotations
+
+import struct
+import threading
+from typing import Callable, Optional
+
+import zstandard
+from sqlalchemy.types import Text, TypeDecorator
+
+from app.core.config import settings
+
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<BI")
+
+
+class Codec:
+    def __init__(self, level: int):
+        self.level = level
+        self._dicts: dict[int, Optional[zstandard.ZstdCompressionDict]] = {0: None}
+        self.current_key = 0
+        self.loader: Optional[Callable[[int], Optional[bytes]]] = None  # fetches unknown keys (app.db.compression)
+        self._local = threading.local()  # zstd (de)compressors are not safe to share across threads
+
+    @staticmethod
+    def make_dict(data: bytes, raw: bool) -> zstandard.ZstdCompressionDict:
+        dict_type = zstandard.DICT_TYPE_RAWCONTENT if raw else zstandard.DICT_TYPE_AUTO
+        return zstandard.ZstdCompressionDict(data, dict_type=dict_type)
+
+    def add(self, key: int, data: bytes, raw: bool, current: bool = False) -> None:
+        self._dicts[key] = self.make_dict(data, raw)
+        if current:
+            self.current_key = key
+
+    def _dict(self, key: int) -> Optional[zstandard.ZstdCompressionDict]:
+        if key not in self._dicts:
+            loaded = self.loader(key) if self.loader else None
+            if loaded is None:
+                raise ValueError(f"unknown compression dictionary {key}")
+            self._dicts[key] = self.make_dict(*loaded)
+        return self._dicts[key]
+
+    def _compressor(self, key: int) -> zstandard.ZstdCompressor:
+        cache = self._local.__dict__.setdefault("compressors", {})
+        if key not in cache:
+            cache[key] = zstandard.ZstdCompressor(level=self.level, dict_data=self._dict(key), write_dict_id=False)
+        return cache[key]
+
+    def _decompressor(self, key: int) -> zstandard.ZstdDecompressor:
+        cache = self._local.__dict__.setdefault("decompressors", {})
+        if key not in cache:
+            cache[key] = zstandard.ZstdDecompressor(dict_data=self._dict(key))
+        return cache[key]
+
+    def compress(self, value: str) -> str | bytes:
+        data = value.encode()
+        if len(data) < settings.compress_min_bytes:
+            return value
+        key = self.current_key
+        blob = _HEADER.pack(FORMAT_VERSION, key) + self._compressor(key).compress(data)
+        return blob if len(blob) < len(data) else value
+
+    def decompress(self, value: str | bytes | None) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        version, key = _HEADER.unpack_from(value)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unknown compressed value format {version}")
+        return self._decompressor(key).decompress(value[_HEADER.size:]).decode()
+
+
+codec = Codec(level=settings.compress_level)
+
+
+class CompressedText(TypeDecorator):
+    """A str column stored zstd-compressed (see module docstring)."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else codec.compress(value)
+
+    def process_result_value(self, value, dialect):
+        return codec.decompress(value)
@@ -4,10 +4,40 @@ from pathlib import Path
 class Settings(BaseModel):
     app_name: str = "Lab MVP API"
     sqlite_path: str = str(Path(__file__).resolve().parents[2] / "data" / "app.db")
+    legacy_sqlite_path: str = str(Path(__file__).resolve().parents[2] / "labmvp.db")  # retired SOP document DB, imported by migration 2
+    # SQLite storage profile, applied to every connection (app.db.session)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64 * 1024  # negative = KiB, i.e. 64 MiB per connection
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_read_pool_size: int = 8  # read-only connections; writes go through one connection
     upload_dir: str = str(Path(__file__).resolve().parents[2] / "uploads")
+    upload_chunk_bytes: int = 1024 * 1024  # 1 MiB per read/write
+    max_upload_bytes: int = 4 * 1024 * 1024 * 1024  # 4 GiB, 0 = unlimited
     jwt_secret: str = "CHANGE_ME_IN_PROD"
     jwt_algorithm: str = "HS256"
     jwt_exp_minutes: int = 60 * 24  # 24h
+    bcrypt_rounds: int = 12  # raising it rehashes existing passwords on their next login
+    hash_workers: int = 2  # processes dedicated to bcrypt
+    hash_max_queue: int = 64  # logins allowed to wait for a worker before 503
+    auth_cache_ttl_seconds: int = 300  # token -> user cache (get_current_user)
+    auth_cache_size: int = 4096
+    response_cache_size: int = 512  # cached catalog GET responses per worker
+    response_cache_ttl_seconds: int = 300  # how long a cached body is kept
+    response_cache_path: str = ""  # shared SQLite file for multi-worker deployments; "" = per process
+    sync_settle_seconds: int = 5  # /sync holds back rows this fresh: their transaction may not be visible yet
+    tombstone_retention_days: int = 90  # older sync cursors get 410 and must resync from scratch
+    maintenance_horizon_days: int = 365  # how far ahead the precomputed maintenance schedule reaches
+    maintenance_refresh_seconds: int = 30  # how often the schedule checks the DB for other workers' equipment writes
+    query_guard_enabled: bool = True  # N+1 / slow-query log (app.core.query_guard)
+    query_repeat_threshold: int = 10  # same statement more often than this in one request = N+1 suspect
+    slow_query_ms: int = 100
+    query_log_size: int = 200  # entries kept per list
+    compress_min_bytes: int = 128  # shorter markdown bodies stay plain TEXT
+    compress_level: int = 6  # zstd level for CompressedText columns
+    compress_dict_bytes: int = 64 * 1024  # size of a trained shared dictionary
 
     dev_bypass_auth: bool = True   # ✅ 추가 (개발 중 로그인 패스)
 
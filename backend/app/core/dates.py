@@ -0,0 +1,32 @@
+"""Lenient parsing of the free-form date strings the forms store (e.g. ``expiry_date``)."""
+import calendar
+import re
+from datetime import date
+from typing import Optional
+
+# 2025-03-01, 2025.3.1, 2025/03/01, 2025년 3월 1일, 2025-03 (day optional); ISO datetimes match by prefix
+_YMD = re.compile(r"^\s*(\d{4})\s*[-./년]\s*(\d{1,2})\s*(?:[-./월]\s*(?:(\d{1,2})\s*일?)?)?")
+_COMPACT = re.compile(r"^\s*(\d{4})(\d{2})(\d{2})\s*$")
+
+
+def parse_date(value: Optional[str], *, end_of_month: bool = False) -> Optional[date]:
+    """Return the date in ``value``, or None if there is none.
+
+    A month without a day means its first day, or its last with ``end_of_month``
+    ("EXP 2025-03" is usable through March 31).
+    """
+    if not value:
+        return None
+    m = _COMPACT.match(value) or _YMD.match(value)
+    if not m:
+        return None
+    year, month = int(m.group(1)), int(m.group(2))
+    if not 1 <= month <= 12:
+        return None
+    day = m.group(3)
+    if day is None:
+        day = calendar.monthrange(year, month)[1] if end_of_month else 1
+    try:
+        return date(year, month, int(day))
+    except ValueError:
+        return None
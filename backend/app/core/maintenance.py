@@ -0,0 +1,112 @@
+"""Equipment maintenance due dates.
+
+``maintenance_cycle`` ("분기", "6개월", ...) plus ``last_maintenance_date`` give
+the next due date; a ``next_maintenance_date`` typed in by hand wins while it
+is still ahead of the last maintenance (e.g. a booked vendor visit). The result
+is kept in the indexed ``next_maintenance_on`` column by
+``refresh_maintenance``, which every equipment write calls in its transaction.
+"""
+import calendar
+import re
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Connection
+
+from app.core.dates import parse_date
+from app.models.equipment import Equipment
+
+DERIVED_FIELDS = {"last_maintenance_on", "next_maintenance_on"}  # ignored in client payloads
+
+# cycle -> (months, weeks)
+CYCLES = {
+    "주간": (0, 1), "매주": (0, 1),
+    "격주": (0, 2),
+    "월": (1, 0), "월간": (1, 0), "매월": (1, 0),
+    "분기": (3, 0),
+    "반기": (6, 0),
+    "연": (12, 0), "연간": (12, 0), "년": (12, 0), "매년": (12, 0),
+}
+_COUNTED = re.compile(r"^\s*(\d+)\s*(주|개월|달|년)\s*(?:마다)?\s*$")
+
+_equipment = Equipment.__table__
+
+
+def parse_cycle(cycle: Optional[str]) -> Optional[tuple[int, int]]:
+    """(months, weeks) for a cycle label, or None for 비정기/unknown."""
+    if not cycle:
+        return None
+    if cycle.strip() in CYCLES:
+        return CYCLES[cycle.strip()]
+    m = _COUNTED.match(cycle)
+    if not m:
+        return None
+    n, unit = int(m.group(1)), m.group(2)
+    if n <= 0:
+        return None
+    return (0, n) if unit == "주" else (n * 12 if unit == "년" else n, 0)
+
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def next_due(cycle: Optional[str], last: Optional[date], planned: Optional[date]) -> Optional[date]:
+    if planned is not None and (last is None or planned > last):
+        return planned
+    step = parse_cycle(cycle)
+    if last is None or step is None:
+        return planned
+    months, weeks = step
+    return add_months(last, months) + timedelta(weeks=weeks)
+
+
+def refresh_maintenance(conn: Connection, ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute the typed maintenance dates for ``ids`` (all equipment if None)."""
+    stmt = select(
+        _equipment.c.id,
+        _equipment.c.maintenance_cycle,
+        _equipment.c.last_maintenance_date,
+        _equipment.c.next_maintenance_date,
+        _equipment.c.last_maintenance_on,
+        _equipment.c.next_maintenance_on,
+    )
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return
+        stmt = stmt.where(_equipment.c.id.in_(ids))
+
+    changed = []
+    for row in conn.execute(stmt):
+        last = parse_date(row.last_maintenance_date)
+        due = next_due(row.maintenance_cycle, last, parse_date(row.next_maintenance_date))
+        if (last, due) != (row.last_maintenance_on, row.next_maintenance_on):
+            changed.append({"eid": row.id, "last": last, "due": due})
+    if changed:
+        # derived values only: keep updated_at (and so /sync) untouched
+        conn.execute(
+            update(_equipment)
+            .where(_equipment.c.id == bindparam("eid"))
+            .values(
+                last_maintenance_on=bindparam("last"),
+                next_maintenance_on=bindparam("due"),
+                updated_at=_equipment.c.updated_at,
+            ),
+            changed,
+        )
+
+
+def backfill_maintenance(conn: Connection) -> None:
+    """Migration for databases created before the typed columns existed."""
+    pending = conn.execute(
+        select(_equipment.c.id).where(
+            (_equipment.c.last_maintenance_date != "") & _equipment.c.last_maintenance_on.is_(None)
+            | (_equipment.c.next_maintenance_date != "") & _equipment.c.next_maintenance_on.is_(None)
+        ).limit(1)
+    ).first()
+    if pending is not None:
+        refresh_maintenance(conn)
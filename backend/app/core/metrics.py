@@ -0,0 +1,233 @@
+"""In-process request and database metrics, rendered in Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request and labels it with the route
+template (``/api/equipment/{equipment_id}``, never the raw path, so label
+cardinality stays bounded). ``instrument_engine`` hooks an engine's cursor
+events; queries are charged to the request running them through a context
+variable, which also feeds the ``Server-Timing`` response header. Values are
+per process: with several uvicorn workers, scrape each one.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+UNMATCHED = "<unmatched>"  # 404s and mounts: keep them out of the route label space
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labels, labels)} {value:g}"
+
+
+class Gauge(_Metric):
+    """A value read at scrape time (``source``) or set/inc'd directly."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, source: Optional[Callable[[], float]] = None):
+        super().__init__(name, help)
+        self._source = source
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        yield f"{self.name} {(self._source() if self._source else self.value):g}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        self._values: dict[tuple, list[float]] = {}  # labels -> per-bucket counts (+Inf last), sum
+
+    def observe(self, labels: tuple, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)  # le is inclusive
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            counts[i] += 1
+            counts[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        with self._lock:
+            items = sorted((labels, list(counts)) for labels, counts in self._values.items())
+        for labels, counts in items:
+            cumulative = 0.0
+            for le, count in zip((*(f"{b:g}" for b in self.buckets), "+Inf"), counts):
+                cumulative += count
+                bucket = _labels(self.labels, labels, 'le="' + le + '"')
+                yield f"{self.name}_bucket{bucket} {cumulative:g}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {counts[-1]:g}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative:g}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+ROUTE = ("method", "route")
+REQUESTS = registry.register(Counter("http_requests_total", "HTTP requests by route and status", (*ROUTE, "status")))
+LATENCY = registry.register(Histogram("http_request_duration_seconds", "Time until the response was fully sent", LATENCY_BUCKETS, ROUTE))
+RESPONSE_SIZE = registry.register(Histogram("http_response_size_bytes", "Response body size", SIZE_BUCKETS, ROUTE))
+IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "Requests currently being handled"))
+REQUEST_QUERIES = registry.register(Histogram("db_queries_per_request", "SQL statements executed per request", COUNT_BUCKETS, ROUTE))
+REQUEST_DB_TIME = registry.register(Counter("db_request_time_seconds_total", "Time spent in SQL statements, by route", ROUTE))
+QUERY_TIME = registry.register(Histogram("db_query_duration_seconds", "Duration of single SQL statements", QUERY_BUCKETS, ("engine",)))
+
+
+@dataclass
+class RequestStats:
+    request: str = ""  # "GET /api/records/3/full"
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)  # fingerprint -> count (app.core.query_guard)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Count statements and their time on ``engine`` (use ``.sync_engine`` for async engines)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        QUERY_TIME.observe((name,), elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED
+
+
+class MetricsMiddleware:
+    """Pure ASGI (not BaseHTTPMiddleware), so streaming responses stay streaming."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(request=f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                # up to the headers: a streamed body's queries only reach /metrics
+                app_ms = (time.perf_counter() - started) * 1000
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="queries={stats.queries}", app;dur={app_ms:.2f}',
+                )
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.inc(-1)
+            _current.reset(token)
+            labels = (scope["method"], _route_label(scope))
+            REQUESTS.inc((*labels, str(status)))
+            LATENCY.observe(labels, time.perf_counter() - started)
+            RESPONSE_SIZE.observe(labels, size)
+            REQUEST_QUERIES.observe(labels, stats.queries)
+            REQUEST_DB_TIME.inc(labels, stats.db_seconds)
@@ -0,0 +1,162 @@
+"""N+1 and slow-query detection.
+
+Every statement is reduced to a fingerprint (literals, parameters and IN lists
+collapsed). Within one request, a fingerprint that runs more than
+``settings.query_repeat_threshold`` times is logged once as an N+1 suspect.
+Statements slower than ``settings.slow_query_ms`` go to a ring buffer. Each
+distinct fingerprint keeps one sample for ``EXPLAIN QUERY PLAN``. Plans are
+computed when the log is read (GET /api/admin/queries), not on the request
+path, so a full-table ``SCAN`` shows up even while the table is still small
+enough to be fast.
+
+``settings.query_guard_enabled`` switches all of it off at runtime.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import current_stats
+
+logger = logging.getLogger(__name__)
+
+_SPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+# a bare "SCAN <table>" reads every row; "USING INDEX" scans and FTS lookups don't count
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.S)
+_FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\S+)(?: AS \S+)?$")
+
+MAX_FINGERPRINTS = 1000
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    sql = _SPACE.sub(" ", statement.strip())
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(?)", sql)
+    return _ROWS.sub("(?)", sql)
+
+
+def _short(fp: str) -> str:
+    # log lines only: ORM selects list every column
+    return _SELECT_LIST.sub("SELECT … FROM ", fp, count=1)
+
+
+def _public(entry: dict) -> dict:
+    # parameters can hold user data (password hashes on insert): never sent out
+    return {k: v for k, v in entry.items() if k not in ("parameters", "statement")}
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """Tables read end to end according to an EXPLAIN QUERY PLAN."""
+    return [m.group(1) for m in map(_FULL_SCAN.match, plan) if m]
+
+
+class QueryLog:
+    def __init__(self, size: int):
+        self._lock = threading.Lock()
+        self.slow: deque[dict] = deque(maxlen=size)
+        self.repeated: deque[dict] = deque(maxlen=size)
+        self._samples: OrderedDict[str, dict] = OrderedDict()  # fingerprint -> one execution
+
+    def clear(self) -> None:
+        with self._lock:
+            self.slow.clear()
+            self.repeated.clear()
+            self._samples.clear()
+
+    def observe(self, engine: str, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+        fp = fingerprint(statement)
+        stats = current_stats()
+        request = stats.request if stats else None
+        with self._lock:
+            if fp not in self._samples:
+                self._samples[fp] = {"fingerprint": fp, "engine": engine, "statement": statement,
+                                     "parameters": None if executemany else parameters, "plan": None}
+                if len(self._samples) > MAX_FINGERPRINTS:
+                    self._samples.popitem(last=False)
+            if elapsed * 1000 >= settings.slow_query_ms:
+                self.slow.append({
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "request": request,
+                    "engine": engine,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "fingerprint": fp,
+                    "statement": statement,
+                    "parameters": None if executemany else parameters,
+                    "plan": None,
+                })
+        if stats is None:
+            return
+        count = stats.statements[fp] = stats.statements.get(fp, 0) + 1
+        if count == settings.query_repeat_threshold + 1:
+            logger.warning("N+1 suspect: %s ran %d+ times in %s", _short(fp), count, request)
+            # the request's own counter keeps counting; read it when the log is rendered
+            self.repeated.append({"at": datetime.now(timezone.utc).isoformat(), "request": request,
+                                  "fingerprint": fp, "_counts": stats.statements})
+
+    def report(self, explain) -> dict:
+        """Snapshot for the admin endpoint; ``explain(statement, parameters)`` fills in missing plans."""
+        with self._lock:
+            slow, repeated, samples = list(self.slow), list(self.repeated), list(self._samples.values())
+        for entry in (*slow, *samples):
+            if entry["plan"] is None:
+                entry["plan"] = explain(entry["statement"], entry["parameters"])
+        return {
+            "slow": [{**_public(e), "full_scans": full_scans(e["plan"])} for e in reversed(slow)],
+            "repeated": [
+                {"at": e["at"], "request": e["request"], "fingerprint": e["fingerprint"],
+                 "count": e["_counts"][e["fingerprint"]]}
+                for e in reversed(repeated)
+            ],
+            "full_scans": [
+                {**_public(e), "full_scans": full_scans(e["plan"])} for e in samples if full_scans(e["plan"])
+            ],
+        }
+
+
+query_log = QueryLog(settings.query_log_size)
+
+
+def install_query_guard(engine: Engine, name: str) -> None:
+    """Feed ``engine``'s statements to ``query_log`` (use ``.sync_engine`` for async engines)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._guard_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        if not settings.query_guard_enabled or statement.startswith("EXPLAIN"):
+            return
+        query_log.observe(name, statement, parameters, executemany, time.perf_counter() - context._guard_started)
+
+
+def explain_with(engine: Engine):
+    """An ``explain`` for ``QueryLog.report`` running on ``engine`` (a read-only one is fine)."""
+
+    def explain(statement: str, parameters: Optional[tuple]) -> list[str]:
+        if parameters is None:
+            return ["(executemany: not explained)"]
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        except Exception as e:  # the sample may reference a table that is gone, a temp table, ...
+            return [f"(explain failed: {e})"]
+        return [row[-1] for row in rows]
+
+    return explain
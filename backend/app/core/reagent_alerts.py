@@ -0,0 +1,85 @@
+"""Derived reagent columns and the ``reagentalert`` table.
+
+``expiry_date`` / ``open_date`` stay free-form strings (that is what the forms
+edit); ``refresh_reagent_alerts`` parses them into ``expiry_on`` / ``opened_on``
+and rewrites the alert rows of the given reagents. Every reagent write calls
+it inside its own transaction, so ``GET /reagents/alerts`` is two index range
+scans over ``reagentalert`` instead of a pass over all reagents.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.engine import Connection
+
+from app.core.dates import parse_date
+from app.models.reagent import Reagent
+from app.models.reagent_alert import ReagentAlert
+
+EXPIRY = "expiry"
+LOW_STOCK = "low_stock"
+LOW_STOCK_STATUSES = {"부족", "없음", "품절"}
+DERIVED_FIELDS = {"expiry_on", "opened_on"}  # ignored in client payloads
+
+_reagent = Reagent.__table__
+_alert = ReagentAlert.__table__
+
+
+def is_low_stock(stock_status: str, qty_est: int, min_stock: int) -> bool:
+    return stock_status in LOW_STOCK_STATUSES or (min_stock > 0 and qty_est <= min_stock)
+
+
+def refresh_reagent_alerts(conn: Connection, ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute typed dates and alerts for ``ids`` (all reagents if None); deleted ids just lose their alerts."""
+    stmt = select(
+        _reagent.c.id,
+        _reagent.c.expiry_date,
+        _reagent.c.open_date,
+        _reagent.c.stock_status,
+        _reagent.c.qty_est,
+        _reagent.c.min_stock,
+        _reagent.c.expiry_on,
+        _reagent.c.opened_on,
+    )
+    clear = delete(_alert)
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return
+        stmt = stmt.where(_reagent.c.id.in_(ids))
+        clear = clear.where(_alert.c.reagent_id.in_(ids))
+
+    changed, alerts = [], []
+    for row in conn.execute(stmt):
+        expiry_on = parse_date(row.expiry_date, end_of_month=True)
+        opened_on = parse_date(row.open_date)
+        if (expiry_on, opened_on) != (row.expiry_on, row.opened_on):
+            changed.append({"rid": row.id, "expiry": expiry_on, "opened": opened_on})
+        if expiry_on is not None:
+            alerts.append({"reagent_id": row.id, "kind": EXPIRY, "due_on": expiry_on})
+        if is_low_stock(row.stock_status, row.qty_est, row.min_stock):
+            alerts.append({"reagent_id": row.id, "kind": LOW_STOCK, "due_on": None})
+
+    if changed:
+        # derived values only: keep updated_at (and so /sync) untouched
+        conn.execute(
+            update(_reagent)
+            .where(_reagent.c.id == bindparam("rid"))
+            .values(expiry_on=bindparam("expiry"), opened_on=bindparam("opened"), updated_at=_reagent.c.updated_at),
+            changed,
+        )
+    conn.execute(clear)
+    if alerts:
+        conn.execute(insert(_alert), alerts)
+
+
+def backfill_reagent_alerts(conn: Connection) -> None:
+    """Migration for databases created before the typed columns existed."""
+    pending = conn.execute(
+        select(_reagent.c.id).where(
+            ((_reagent.c.expiry_date != "") & _reagent.c.expiry_on.is_(None))
+            | ((_reagent.c.open_date != "") & _reagent.c.opened_on.is_(None))
+        ).limit(1)
+    ).first()
+    empty = conn.execute(select(_alert.c.reagent_id).limit(1)).first() is None
+    if pending is not None or empty:
+        refresh_reagent_alerts(conn)
@@ -0,0 +1,147 @@
+"""Streaming, content-addressed file storage for uploads.
+
+Uploads are copied to disk in ``settings.upload_chunk_bytes`` chunks while the
+SHA-256 and byte count are computed, so peak memory per upload is one chunk.
+Blocking file I/O runs in the threadpool; the final file appears atomically via
+``os.replace`` from a temp file in the same directory tree.
+
+Stored files live in a blob store keyed by their SHA-256 and sharded as
+``<upload_dir>/blobs/ab/cd/abcd...``. A ``Blob`` row counts the attachments and
+SOP documents that reference each blob, so identical uploads share one file.
+"""
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from fastapi import UploadFile
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.blob import Blob
+
+
+class StoredFile(NamedTuple):
+    path: Path
+    sha256: str
+    size_bytes: int
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, limit: int):
+        super().__init__(f"File exceeds {limit} bytes")
+        self.limit = limit
+
+
+def _open_temp(tmp_dir: Path) -> tuple[Path, BinaryIO]:
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid.uuid4().hex}.part"
+    return tmp_path, open(tmp_path, "wb")
+
+
+def _write_chunk(fh: BinaryIO, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    fh.write(chunk)
+
+
+def _finish(fh: BinaryIO) -> None:
+    fh.flush()
+    os.fsync(fh.fileno())
+    fh.close()
+
+
+def _discard(fh: BinaryIO, tmp_path: Path) -> None:
+    fh.close()
+    tmp_path.unlink(missing_ok=True)
+
+
+async def stream_to_temp(file: UploadFile, tmp_dir: Path, max_bytes: int | None = None) -> StoredFile:
+    """Copy ``file`` to a temp file under ``tmp_dir``; the caller moves it into place."""
+    limit = settings.max_upload_bytes if max_bytes is None else max_bytes
+    # the multipart parser already knows the size; refuse before copying anything
+    if limit and file.size is not None and file.size > limit:
+        raise UploadTooLarge(limit)
+
+    tmp_path, fh = await run_in_threadpool(_open_temp, tmp_dir)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(settings.upload_chunk_bytes):
+            size += len(chunk)
+            if limit and size > limit:
+                raise UploadTooLarge(limit)
+            await run_in_threadpool(_write_chunk, fh, hasher, chunk)
+        await run_in_threadpool(_finish, fh)
+    except BaseException:
+        await run_in_threadpool(_discard, fh, tmp_path)
+        raise
+    return StoredFile(tmp_path, hasher.hexdigest(), size)
+
+
+def blob_root() -> Path:
+    return Path(settings.upload_dir) / "blobs"
+
+
+def blob_path(sha256: str) -> Path:
+    return blob_root() / sha256[:2] / sha256[2:4] / sha256
+
+
+def _place_blob(tmp_path: Path, dest: Path) -> None:
+    if dest.exists():
+        # same content already stored: drop the copy instead of rewriting it
+        tmp_path.unlink(missing_ok=True)
+        return
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_path, dest)
+
+
+# The Blob row and the file change together under SQLite's write lock: the
+# first write of a transaction takes it and the commit releases it. Uploads
+# take their reference before deciding whether their temp copy is needed, and
+# the last release unlinks before committing, so an upload of the same content
+# either sees the row gone (and keeps its copy) or keeps the file alive.
+
+def acquire_blob(session: Session, upload: StoredFile) -> StoredFile:
+    """Add one reference to a freshly received upload and move it into place; caller commits."""
+    try:
+        stmt = insert(Blob).values(sha256=upload.sha256, size_bytes=upload.size_bytes, ref_count=1)
+        stmt = stmt.on_conflict_do_update(index_elements=["sha256"], set_={"ref_count": Blob.ref_count + 1})
+        session.exec(stmt)
+        dest = blob_path(upload.sha256)
+        _place_blob(upload.path, dest)
+    except BaseException:
+        upload.path.unlink(missing_ok=True)
+        raise
+    return StoredFile(dest, upload.sha256, upload.size_bytes)
+
+
+def acquire_existing_blob(session: Session, sha256: str) -> Blob | None:
+    """Add one reference to a blob already stored; None if it is not. Caller commits (or rolls back)."""
+    session.exec(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + 1))
+    blob = session.get(Blob, sha256, populate_existing=True)
+    if blob is None or not blob_path(sha256).exists():
+        return None
+    return blob
+
+
+def release_blob(session: Session, sha256: str) -> None:
+    """Drop one reference, deleting the row and the file with the last one; caller commits.
+
+    Call it after the transaction's other writes, and commit right after.
+    """
+    session.exec(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - 1))
+    blob = session.get(Blob, sha256, populate_existing=True)
+    if blob is None or blob.ref_count > 0:
+        return
+    session.delete(blob)
+    session.flush()
+    blob_path(sha256).unlink(missing_ok=True)
+
+
+async def receive_blob(file: UploadFile, max_bytes: int | None = None) -> StoredFile:
+    """Stream ``file`` to a temp file in the blob store; ``acquire_blob`` moves it into place."""
+    return await stream_to_temp(file, blob_root() / ".tmp", max_bytes)
+
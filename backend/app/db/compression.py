@@ -0,0 +1,147 @@
+"""Dictionaries and bulk (re)compression for ``CompressedText`` columns.
+
+``ensure_dictionary`` runs at startup. Once the database holds some bodies,
+it builds the first dictionary from them, which in practice means the seeded
+templates and SOPs. With enough samples it trains a real zstd dictionary;
+with only a handful it uses their raw text. It then rewrites the existing
+rows with that dictionary. ``python -m app.db.compression retrain`` builds a
+new dictionary from today's data later on; values keep the key of the
+dictionary that wrote them, so old dictionaries stay loadable.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Optional
+
+import zstandard
+from sqlalchemy import Column, LargeBinary, Table, bindparam, func, insert, literal, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+from app.core.compression import FORMAT_VERSION, CompressedText, codec
+from app.core.config import settings
+from app.models.zstd_dictionary import ZstdDictionary
+
+SAMPLES_PER_COLUMN = 500
+TRAIN_MIN_SAMPLES = 100  # below this zstd training fails or overfits; use raw text instead
+BATCH_SIZE = 500
+
+_dictionary = ZstdDictionary.__table__
+
+
+def compressed_columns() -> list[tuple[Table, Column]]:
+    return [
+        (table, col)
+        for table in SQLModel.metadata.sorted_tables
+        for col in table.columns
+        if isinstance(col.type, CompressedText)
+    ]
+
+
+def load_dictionaries(conn: Connection) -> None:
+    rows = conn.execute(select(_dictionary).order_by(_dictionary.c.id)).all()
+    for row in rows:
+        codec.add(row.id, row.data, row.raw_content, current=row is rows[-1])
+
+
+def loader(engine: Engine):
+    """``codec.loader``: fetch a dictionary another process created after we started."""
+
+    def load(key: int) -> Optional[tuple[bytes, bool]]:
+        with engine.connect() as conn:
+            row = conn.execute(select(_dictionary).where(_dictionary.c.id == key)).first()
+        return (row.data, row.raw_content) if row else None
+
+    return load
+
+
+def _samples(conn: Connection) -> list[bytes]:
+    seen: dict[bytes, None] = {}
+    for table, col in compressed_columns():
+        rows = conn.execute(
+            select(col).where(col != "").order_by(table.c.id.desc()).limit(SAMPLES_PER_COLUMN)
+        ).scalars()
+        for value in rows:
+            seen.setdefault(value.encode(), None)
+    return list(seen)
+
+
+def build_dictionary(samples: list[bytes]) -> tuple[bytes, bool]:
+    """(dictionary bytes, raw_content) from sample values, newest first."""
+    if len(samples) >= TRAIN_MIN_SAMPLES:
+        try:
+            trained = zstandard.train_dictionary(settings.compress_dict_bytes, samples, level=settings.compress_level)
+            return trained.as_bytes(), False
+        except zstandard.ZstdError:
+            pass
+    # raw content: zstd prefers matches near the end, so the newest samples go last
+    return b"".join(reversed(samples))[-settings.compress_dict_bytes:], True
+
+
+def create_dictionary(conn: Connection) -> Optional[int]:
+    samples = _samples(conn)
+    if not samples:
+        return None
+    data, raw = build_dictionary(samples)
+    key = conn.execute(
+        insert(_dictionary).values(data=data, raw_content=raw, samples=len(samples)).returning(_dictionary.c.id)
+    ).scalar_one()
+    codec.add(key, data, raw, current=True)
+    return key
+
+
+def recompress(conn: Connection) -> int:
+    """Rewrite every value not yet compressed with the current dictionary; returns rows touched."""
+    key_bytes = struct.pack("<I", codec.current_key)
+    touched = 0
+    for table, col in compressed_columns():
+        stale = or_(
+            (func.typeof(col) == "text") & (func.length(col) >= settings.compress_min_bytes),
+            (func.typeof(col) == "blob")
+            & (func.substr(col, 1, 1) == literal(bytes([FORMAT_VERSION]), LargeBinary))
+            & (func.substr(col, 2, 4) != literal(key_bytes, LargeBinary)),
+        )
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            # a storage change, not an edit: keep updated_at (and so /sync) untouched
+            .values({col.name: bindparam("value"), "updated_at": table.c.updated_at})
+        )
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                select(table.c.id, col).where(stale, table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            conn.execute(stmt, [{"row_id": row_id, "value": value} for row_id, value in rows])
+            touched += len(rows)
+            last_id = rows[-1][0]
+    return touched
+
+
+def ensure_dictionary(conn: Connection) -> None:
+    """Load the dictionaries; create the first one (and recompress) once there is data to learn from."""
+    load_dictionaries(conn)
+    if codec.current_key == 0 and create_dictionary(conn) is not None:
+        recompress(conn)
+
+
+def retrain(conn: Connection) -> Optional[int]:
+    key = create_dictionary(conn)
+    if key is not None:
+        recompress(conn)
+    return key
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.db.session import engine, init_db
+
+    if sys.argv[1:] != ["retrain"]:
+        sys.exit("usage: python -m app.db.compression retrain")
+    init_db()
+    with engine.begin() as conn:
+        key = retrain(conn)
+    print(f"dictionary {key} is now current" if key else "no data to train on")
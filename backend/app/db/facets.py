@@ -0,0 +1,74 @@
+"""``facetcount``: per-value row counts of the enum-like list filter columns.
+
+Triggers on each entity table adjust the count of the old and new value on
+insert, update and delete, so ORM writes, bulk statements and imports all
+keep it current. ``GET /{entity}/facets`` reads it when no other filter is
+active (app.api.facets); the table holds one row per distinct value, whatever
+the size of the entity tables. NULLs are not counted.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.models.facet_count import FacetCount
+from app.models.registry import ENTITY_MODELS
+
+# URL entity name -> columns shown as filter chips (each also has an index, so it is a list filter)
+FACET_FIELDS = {
+    "facilities": ("facility_type", "bsl_level"),
+    "equipment": ("status", "domain"),
+    "reagents": ("category", "storage_temp", "stock_status"),
+    "sops": ("domain",),
+    "templates": ("experiment_type",),
+    "records": ("experiment_type", "status"),
+}
+
+
+def _add(entity: str, field: str, row: str, when: str = "") -> str:
+    # WHERE is required between an INSERT ... SELECT and its ON CONFLICT clause
+    return (
+        f"INSERT INTO facetcount(entity, field, value, count) SELECT '{entity}', '{field}', {row}.{field}, 1 "
+        f"WHERE {row}.{field} IS NOT NULL{when} ON CONFLICT(entity, field, value) DO UPDATE SET count = count + 1; "
+    )
+
+
+def _remove(entity: str, field: str, row: str, when: str = "") -> str:
+    return (
+        f"UPDATE facetcount SET count = count - 1 "
+        f"WHERE entity = '{entity}' AND field = '{field}' AND value = {row}.{field}{when}; "
+    )
+
+
+def _ddl(entity: str) -> list[str]:
+    table = ENTITY_MODELS[entity].__tablename__
+    fields = FACET_FIELDS[entity]
+    prune = f"DELETE FROM facetcount WHERE entity = '{entity}' AND count <= 0; "
+    changed = {f: f" AND old.{f} IS NOT new.{f}" for f in fields}
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_facets_ai AFTER INSERT ON {table} BEGIN "
+        + "".join(_add(entity, f, "new") for f in fields) + "END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_facets_au AFTER UPDATE OF {', '.join(fields)} ON {table} BEGIN "
+        + "".join(_remove(entity, f, "old", changed[f]) + _add(entity, f, "new", changed[f]) for f in fields)
+        + prune + "END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_facets_ad AFTER DELETE ON {table} BEGIN "
+        + "".join(_remove(entity, f, "old") for f in fields) + prune + "END",
+    ]
+
+
+def ensure_facet_index(conn: Connection) -> None:
+    """Create ``facetcount`` and its triggers if missing."""
+    FacetCount.__table__.create(conn, checkfirst=True)
+    for entity in FACET_FIELDS:
+        for stmt in _ddl(entity):
+            conn.execute(text(stmt))
+
+
+def rebuild_facets(conn: Connection) -> None:
+    """Recount every value from the entity tables."""
+    conn.execute(text("DELETE FROM facetcount"))
+    for entity, fields in FACET_FIELDS.items():
+        table = ENTITY_MODELS[entity].__tablename__
+        for field in fields:
+            conn.execute(text(
+                f"INSERT INTO facetcount(entity, field, value, count) SELECT '{entity}', '{field}', {field}, count(*) "
+                f"FROM {table} WHERE {field} IS NOT NULL GROUP BY {field}"
+            ))
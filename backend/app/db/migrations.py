@@ -0,0 +1,191 @@
+"""Versioned schema migrations.
+
+The schema version lives in SQLite's ``PRAGMA user_version``; migration N
+brings a database from version N-1 to N. ``init_db`` runs ``migrate`` on
+every worker boot, but once the file is current that is one PRAGMA read: no
+``create_all``, no table reflection, no backfill queries. Deploys run it once
+up front:
+
+    python -m app.db.migrations
+
+Each step runs in its own ``BEGIN IMMEDIATE`` transaction together with the
+version bump, so workers booting side by side queue on the write lock and
+the later ones find the work done. Append new steps to ``MIGRATIONS`` and
+never edit released ones. A new database gets the current schema from the
+baseline (1), so later steps must tolerate finding their change already
+there (``_add_missing_columns``, ``CREATE ... IF NOT EXISTS``).
+"""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import Engine
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.compression import codec
+from app.core.config import settings
+from app.core.maintenance import backfill_maintenance
+from app.core.reagent_alerts import backfill_reagent_alerts
+from app.db.facets import ensure_facet_index, rebuild_facets
+from app.db.compression import load_dictionaries, recompress
+from app.db.search_index import APP_FED, SEARCH_TABLES, drop_search_index, ensure_search_index
+from app.db.tags import drop_tag_triggers, ensure_tag_index, rebuild_tags
+from app.db.tombstones import ensure_tombstone_triggers
+
+# every table model, so the baseline's create_all sees the whole schema
+from app.models import (  # noqa: F401
+    attachment, blob, equipment, experiment_record, experiment_template, facet_count, facility, link_tables,
+    reagent, reagent_alert, sop, sop_document, tag, tombstone, user, zstd_dictionary,
+)
+from app.models.registry import ENTITY_MODELS
+from app.models.sop_document import SopDocument
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _add_missing_columns(conn: Connection):
+    # create_all never alters existing tables; add columns introduced after the DB was created
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+        if not existing:
+            continue
+        added = False
+        for col in table.columns:
+            if col.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(dialect=conn.dialect)}"
+            if col.default is not None and col.default.is_scalar and col.default.arg is not None:
+                ddl += f" DEFAULT {_sql_literal(col.default.arg)}"
+            conn.exec_driver_sql(ddl)
+            added = True
+        if added:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def _baseline(conn: Connection) -> None:
+    """Everything ``init_db`` used to converge on at each boot: tables, late columns, FTS, triggers, derived data."""
+    SQLModel.metadata.create_all(conn)
+    _add_missing_columns(conn)
+    ensure_search_index(conn)
+    ensure_tombstone_triggers(conn, {entity: model.__tablename__ for entity, model in ENTITY_MODELS.items()})
+    backfill_reagent_alerts(conn)
+    backfill_maintenance(conn)
+
+
+def _import_legacy_sop_documents(conn: Connection) -> None:
+    """Copy uploaded SOP documents out of the retired second database (``labmvp.db``)."""
+    path = Path(settings.legacy_sqlite_path)
+    if not path.is_file():
+        return
+    legacy = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    legacy.row_factory = sqlite3.Row
+    try:
+        if not legacy.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sop_documents'").fetchone():
+            return
+        cursor = legacy.execute("SELECT * FROM sop_documents ORDER BY id")
+        columns = [d[0] for d in cursor.description if d[0] in SopDocument.__table__.c]
+        rows = [tuple(row[name] for name in columns) for row in cursor]
+    finally:
+        legacy.close()
+    if rows:
+        # ids are kept: download links handed out so far embed them
+        conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO sop_documents ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows,
+        )
+
+
+def _tag_index(conn: Connection) -> None:
+    """Tag dictionary, link tables and counts, filled from the existing ``tags`` strings."""
+    ensure_tag_index(conn)
+    rebuild_tags(conn)
+
+
+def _facet_counts(conn: Connection) -> None:
+    """Per-value counts of the filter-chip columns, for ``GET /{entity}/facets``."""
+    ensure_facet_index(conn)
+    rebuild_facets(conn)
+
+
+def _tag_triggers_in_sql(conn: Connection) -> None:
+    """Tag triggers that split in plain SQL, so writers without the app's functions keep working."""
+    drop_tag_triggers(conn)
+    ensure_tag_index(conn)
+    rebuild_tags(conn)
+
+
+def _plain_search_columns(conn: Connection) -> None:
+    """Decompress the FTS-indexed bodies, and rebuild FTS without the app-only ``unz()`` function."""
+    load_dictionaries(conn)
+    for table, cols, _ in SEARCH_TABLES.values():
+        drop_search_index(conn, table)  # its triggers call unz()
+        for col in cols:
+            rows = conn.exec_driver_sql(f"SELECT id, {col} FROM {table} WHERE typeof({col}) = 'blob'").all()
+            if rows:
+                # a storage change, not an edit: updated_at (and so /sync) stays as it is
+                conn.exec_driver_sql(
+                    f"UPDATE {table} SET {col} = ? WHERE id = ?", [(codec.decompress(v), i) for i, v in rows]
+                )
+    ensure_search_index(conn)
+
+
+def _compressed_search_columns(conn: Connection) -> None:
+    """Compress the FTS-indexed bodies again; their FTS tables become contentless, fed by the app."""
+    load_dictionaries(conn)
+    for table in APP_FED:
+        drop_search_index(conn, table)  # its triggers would index the compressed bytes
+    recompress(conn)
+    ensure_search_index(conn)
+
+
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    _baseline,  # 1
+    _import_legacy_sop_documents,  # 2
+    _tag_index,  # 3
+    _facet_counts,  # 4
+    _tag_triggers_in_sql,  # 5
+    _plain_search_columns,  # 6
+    _compressed_search_columns,  # 7
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def migrate(engine: Engine) -> list[int]:
+    """Apply pending migrations; returns the versions applied (usually none)."""
+    with engine.connect() as conn:
+        version = schema_version(conn)
+        conn.rollback()
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"database schema is v{version}, newer than this code (v{SCHEMA_VERSION})")
+        applied = []
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if schema_version(conn) >= target:  # another worker got here first
+                conn.rollback()
+                continue
+            MIGRATIONS[target - 1](conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {target}")
+            conn.commit()
+            applied.append(target)
+        return applied
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    done = migrate(engine)
+    print(f"migrated to v{done[-1]}" if done else f"already at v{SCHEMA_VERSION}")
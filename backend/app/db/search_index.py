@@ -0,0 +1,284 @@
+"""SQLite FTS5 index behind /search.
+
+Each searchable table gets an FTS5 table (``<table>_fts``) whose rowid is the
+entity id. How it is kept in sync depends on the indexed columns:
+
+- All plain text (facility): an external-content table over the entity
+  table, kept by triggers, so ORM writes, bulk statements, seed scripts and
+  the sqlite3 shell all stay indexed.
+- Some ``CompressedText`` (equipment, reagent, experimentrecord): SQLite
+  cannot read those values, so the FTS table is contentless (the index only;
+  the text stays compressed in the entity table) and the app feeds it the
+  plain text. ORM flushes do so through mapper events, bulk writes call
+  ``index_rows``/``unindex_rows``. Rows another tool writes are not indexed
+  until ``python -m app.db.search_index rebuild``.
+
+A contentless table keeps no text for highlight()/snippet(), so
+``highlights`` re-runs the query over the hits' plain text in a private
+in-memory FTS5 table.
+"""
+import sqlite3
+import threading
+from typing import Iterable
+
+from sqlalchemy import TextClause, bindparam, event, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.compression import CompressedText
+from app.models.registry import ENTITY_MODELS
+
+# search type (= ENTITY_MODELS key) -> (table, indexed columns, bm25 weights)
+SEARCH_TABLES: dict[str, tuple[str, list[str], list[float]]] = {
+    "equipment": ("equipment", ["name", "tags", "asset_no", "body_markdown"], [10.0, 5.0, 5.0, 1.0]),
+    "facilities": ("facility", ["name", "tags", "location", "rules_summary"], [10.0, 5.0, 3.0, 1.0]),
+    "reagents": ("reagent", ["name", "tags", "cat_no", "lot_no", "body_markdown"], [10.0, 5.0, 5.0, 5.0, 1.0]),
+    "records": (
+        "experimentrecord",
+        ["title", "tags", "purpose", "method_markdown", "results_summary"],
+        [10.0, 5.0, 3.0, 1.0, 2.0],
+    ),
+}
+TOKENIZE = "unicode61 remove_diacritics 2"
+BATCH_SIZE = 500  # ids per statement, under SQLite's bound-parameter limit
+
+
+def _fts(table: str) -> str:
+    return f"{table}_fts"
+
+
+def _triggers(table: str) -> list[str]:
+    fts = _fts(table)
+    return [f"{fts}_ai", f"{fts}_ad", f"{fts}_au"]
+
+
+def _src(table: str) -> str:
+    # content view that decompressed columns through the app-only unz(); dropped by drop_search_index
+    return f"{table}_fts_src"
+
+
+# tables with compressed indexed columns -> those indexed columns; their FTS is contentless and app-fed
+APP_FED: dict[str, list[str]] = {
+    table: cols
+    for table, cols, _ in SEARCH_TABLES.values()
+    if any(isinstance(SQLModel.metadata.tables[table].c[c].type, CompressedText) for c in cols)
+}
+
+
+def _ddl(table: str, cols: list[str]) -> dict[str, str]:
+    """Object name -> CREATE statement: the FTS table and, for plain-text tables, its triggers."""
+    fts = _fts(table)
+    col_list = ", ".join(cols)
+    if table in APP_FED:
+        return {fts: f"CREATE VIRTUAL TABLE {fts} USING fts5({col_list}, content='', tokenize='{TOKENIZE}')"}
+    new_vals = ", ".join(f"new.{c}" for c in cols)
+    old_vals = ", ".join(f"old.{c}" for c in cols)
+    ai, ad, au = _triggers(table)
+    return {
+        fts: (
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({col_list}, content='{table}', content_rowid='id', "
+            f"tokenize='{TOKENIZE}')"
+        ),
+        ai: (
+            f"CREATE TRIGGER {ai} AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals}); END"
+        ),
+        ad: (
+            f"CREATE TRIGGER {ad} AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals}); END"
+        ),
+        au: (
+            f"CREATE TRIGGER {au} AFTER UPDATE OF {col_list} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals}); "
+            f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals}); END"
+        ),
+    }
+
+
+def drop_search_index(conn: Connection, table: str) -> None:
+    for trigger in _triggers(table):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {_fts(table)}"))
+    conn.execute(text(f"DROP VIEW IF EXISTS {_src(table)}"))
+
+
+def ensure_search_index(conn: Connection) -> None:
+    """Create missing or outdated FTS tables/triggers and backfill them from existing rows."""
+    existing = dict(conn.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'view', 'trigger')"
+    )).all())
+    for table, cols, _ in SEARCH_TABLES.values():
+        if table not in existing:
+            continue
+        ddl = _ddl(table, cols)
+        leftovers = [name for name in [*_triggers(table), _src(table)] if name in existing and name not in ddl]
+        if all(existing.get(name) == stmt for name, stmt in ddl.items()) and not leftovers:
+            continue
+        # built for other columns, or the other kind of FTS table: start over
+        drop_search_index(conn, table)
+        for stmt in ddl.values():
+            conn.execute(text(stmt))
+        _rebuild(conn, table, cols)
+
+
+def _rebuild(conn: Connection, table: str, cols: list[str]) -> None:
+    fts = _fts(table)
+    if table not in APP_FED:
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        return
+    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')"))
+    source = SQLModel.metadata.tables[table]
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(source.c.id, *(source.c[c] for c in cols))
+            .where(source.c.id > last_id).order_by(source.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        conn.execute(_insert(table, cols), [dict(r) for r in rows])
+        last_id = rows[-1]["id"]
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    for table, cols, _ in SEARCH_TABLES.values():
+        _rebuild(conn, table, cols)
+
+
+def _insert(table: str, cols: list[str], command: str = "") -> TextClause:
+    fts = _fts(table)
+    values = ", ".join(f":{c}" for c in cols)
+    if command:
+        return text(f"INSERT INTO {fts}({fts}, rowid, {', '.join(cols)}) VALUES ('{command}', :id, {values})")
+    return text(f"INSERT INTO {fts}(rowid, {', '.join(cols)}) VALUES (:id, {values})")
+
+
+def _plain_rows(conn: Connection, table: str, ids: list[int]) -> list[dict]:
+    """The indexed columns of ``ids`` as stored, decompressed by their column types."""
+    source = SQLModel.metadata.tables[table]
+    rows = []
+    for start in range(0, len(ids), BATCH_SIZE):
+        stmt = select(source.c.id, *(source.c[c] for c in APP_FED[table])).where(
+            source.c.id.in_(ids[start:start + BATCH_SIZE]))
+        rows += [dict(r) for r in conn.execute(stmt).mappings()]
+    return rows
+
+
+def index_rows(conn: Connection, table: str, ids: Iterable[int]) -> None:
+    """Index rows of an app-fed table as they are stored now; call after writing them."""
+    ids = list(ids)
+    if table not in APP_FED or not ids:
+        return
+    rows = _plain_rows(conn, table, ids)
+    if rows:
+        conn.execute(_insert(table, APP_FED[table]), rows)
+
+
+def unindex_rows(conn: Connection, table: str, ids: Iterable[int]) -> None:
+    """Take rows of an app-fed table out of its index; call before they change or go.
+
+    A contentless 'delete' must repeat the text that was indexed, which is the
+    stored text for every row the app wrote. Rows the index never saw (written
+    by another tool) are skipped, since deleting them would corrupt it.
+    """
+    ids = list(ids)
+    if table not in APP_FED or not ids:
+        return
+    fts = _fts(table)
+    lookup = text(f"SELECT rowid FROM {fts} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True))
+    indexed = [
+        rowid
+        for start in range(0, len(ids), BATCH_SIZE)
+        for rowid in conn.execute(lookup, {"ids": ids[start:start + BATCH_SIZE]}).scalars()
+    ]
+    rows = _plain_rows(conn, table, indexed) if indexed else []
+    if rows:
+        conn.execute(_insert(table, APP_FED[table], "delete"), rows)
+
+
+def _feed_from_orm(model, table: str, cols: list[str]) -> None:
+    def changed(target) -> bool:
+        attrs = inspect(target).attrs
+        return any(attrs[c].history.has_changes() for c in cols)
+
+    @event.listens_for(model, "after_insert")
+    def _after_insert(mapper, connection, target):
+        index_rows(connection, table, [target.id])
+
+    @event.listens_for(model, "before_update")
+    def _before_update(mapper, connection, target):
+        if changed(target):
+            unindex_rows(connection, table, [target.id])
+
+    @event.listens_for(model, "after_update")
+    def _after_update(mapper, connection, target):
+        if changed(target):
+            index_rows(connection, table, [target.id])
+
+    @event.listens_for(model, "before_delete")
+    def _before_delete(mapper, connection, target):
+        unindex_rows(connection, table, [target.id])
+
+
+for _type, (_table, _cols, _) in SEARCH_TABLES.items():
+    if _table in APP_FED:
+        _feed_from_orm(ENTITY_MODELS[_type], _table, _cols)
+
+
+def match_expression(q: str) -> str:
+    """Turn free text into an FTS5 query: every term quoted and prefix-matched (AND)."""
+    terms = [t.replace('"', '""') for t in q.split()]
+    return " ".join(f'"{t}"*' for t in terms if t)
+
+
+def search_ids(conn: Connection, type_: str, q: str, limit: int, offset: int) -> list[dict]:
+    """BM25-ranked hits (best first): ``{"id", "score"}``."""
+    table, _, weights = SEARCH_TABLES[type_]
+    fts = _fts(table)
+    sql = text(
+        f"SELECT rowid AS id, bm25({fts}, {', '.join(map(str, weights))}) AS score "
+        f"FROM {fts} WHERE {fts} MATCH :q ORDER BY score LIMIT :limit OFFSET :offset"
+    )
+    rows = conn.execute(sql, {"q": q, "limit": limit, "offset": offset}).mappings().all()
+    return [dict(r) for r in rows]
+
+
+_scratch = threading.local()
+
+
+def highlights(type_: str, q: str, rows: Iterable[dict]) -> dict[int, dict]:
+    """id -> ``{"highlight", "snippet"}`` (marked-up title, best passage) for hits, given their plain rows."""
+    _, cols, _ = SEARCH_TABLES[type_]
+    conn = getattr(_scratch, "conn", None)
+    if conn is None:
+        conn = _scratch.conn = sqlite3.connect(":memory:", isolation_level=None)
+    hits = f"hits_{type_}"
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {hits} USING fts5({', '.join(cols)}, tokenize='{TOKENIZE}')")
+    try:
+        conn.executemany(
+            f"INSERT INTO {hits}(rowid, {', '.join(cols)}) VALUES (?{', ?' * len(cols)})",
+            [(r["id"], *(r[c] for c in cols)) for r in rows],
+        )
+        return {
+            rowid: {"highlight": highlight, "snippet": snippet}
+            for rowid, highlight, snippet in conn.execute(
+                f"SELECT rowid, highlight({hits}, 0, '<mark>', '</mark>'), "
+                f"snippet({hits}, -1, '<mark>', '</mark>', '…', 16) FROM {hits} WHERE {hits} MATCH ?",
+                (q,),
+            )
+        }
+    finally:
+        conn.execute(f"DELETE FROM {hits}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.db.session import engine, init_db
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.db.search_index rebuild")
+    init_db()
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+    print("search index rebuilt")
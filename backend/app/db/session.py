@@ -1,11 +1,112 @@
-from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.compression import codec
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.query_guard import install_query_guard
+from app.db.compression import ensure_dictionary, loader
+from app.db.migrations import migrate
+from app.db.tombstones import prune_tombstones
 
-engine = create_engine(f"sqlite:///{settings.sqlite_path}", echo=False, connect_args={"check_same_thread": False})
+def _profile_pragmas(writer: bool) -> list[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA cache_size = {settings.sqlite_cache_size}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        f"PRAGMA temp_store = {settings.sqlite_temp_store}",
+    ]
+    if writer:
+        # journal_mode is persistent in the file; synchronous only matters for writes
+        pragmas += [
+            f"PRAGMA journal_mode = {settings.sqlite_journal_mode}",
+            f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        ]
+    return pragmas
+
+def _on_connect(pragmas: list[str]):
+    def apply(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+    return apply
+
+_pool_timeout = settings.sqlite_busy_timeout_ms / 1000
+
+# sync writer for init_db (before serving) and scripts (seed, bench, CLIs); while serving,
+# every write goes through async_engine, so a process holds one writer connection
+engine = create_engine(
+    f"sqlite:///{settings.sqlite_path}",
+    echo=False,
+    connect_args={"check_same_thread": False},
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=_pool_timeout,
+)
+event.listen(engine, "connect", _on_connect(_profile_pragmas(writer=True)))
+
+# read-only pool for GET traffic; with WAL these never block (or get blocked by) the writer
+read_engine = create_engine(
+    f"sqlite:///file:{settings.sqlite_path}?mode=ro&uri=true",
+    echo=False,
+    connect_args={"check_same_thread": False},
+    pool_size=settings.sqlite_read_pool_size,
+    max_overflow=0,
+    pool_timeout=_pool_timeout,
+)
+event.listen(read_engine, "connect", _on_connect(_profile_pragmas(writer=False)))
+
+# async twins (aiosqlite) for the API routes. async_engine is the single writer while serving:
+# SQLite serializes writes anyway, so queue them in the pool instead of on the file lock.
+# The sync read_engine still serves exports and the SOP document list/download.
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{settings.sqlite_path}",
+    echo=False,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=_pool_timeout,
+)
+event.listen(async_engine.sync_engine, "connect", _on_connect(_profile_pragmas(writer=True)))
+
+async_read_engine = create_async_engine(
+    f"sqlite+aiosqlite:///file:{settings.sqlite_path}?mode=ro&uri=true",
+    echo=False,
+    pool_size=settings.sqlite_read_pool_size,
+    max_overflow=0,
+    pool_timeout=_pool_timeout,
+)
+event.listen(async_read_engine.sync_engine, "connect", _on_connect(_profile_pragmas(writer=False)))
+
+# per-statement timing for /metrics and the Server-Timing header, plus the N+1/slow-query log
+for _name, _engine in (
+    ("writer", engine),
+    ("reader", read_engine),
+    ("async_writer", async_engine.sync_engine),
+    ("async_reader", async_read_engine.sync_engine),
+):
+    instrument_engine(_engine, _name)
+    install_query_guard(_engine, _name)
+
+codec.loader = loader(read_engine)
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    """Migrate the schema if it is behind (one PRAGMA when current), then load per-process state."""
+    migrate(engine)
+    with engine.begin() as conn:
+        ensure_dictionary(conn)
+        prune_tombstones(conn, settings.tombstone_retention_days)
+
+def get_read_session():
+    with Session(read_engine) as session:
+        yield session
+
+# expire_on_commit=False: objects are serialized after commit and must not lazy-load
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
 
-def get_session():
-    with Session(engine) as session:
+async def get_async_read_session():
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
         yield session
@@ -0,0 +1,96 @@
+"""Normalized tags: the ``tag`` dictionary, per-entity link tables and ``tagcount``.
+
+Entities keep their comma-separated ``tags`` string (forms and imports edit
+it). SQLite triggers on each entity table split it and rewrite that row's
+links, so ORM writes, bulk statements, imports, seed scripts and the sqlite3
+shell all stay in step. The split is plain SQL (no app-registered function):
+the string is rewritten into a JSON array for ``json_each``, and each part is
+trimmed and empty parts skipped. A second set of triggers on the link tables
+keeps ``tagcount`` current. Filtering by tag is then a primary-key range scan
+on a link table, and facet counts are read from a table with one row per
+(entity, tag), whatever the size of the entity tables.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.models.registry import ENTITY_MODELS
+from app.models.tag import TAG_LINKS, Tag, TagCount
+
+# whitespace trimmed around each tag
+_SPACE = "' ' || char(9, 10, 13)"
+
+
+def _split(tags: str) -> str:
+    """``json_each`` over the parts of the SQL expression ``tags``, split on commas."""
+    escaped = tags
+    for raw, escape in (("'\\'", "'\\\\'"), ("'\"'", "'\\\"'"),
+                        ("char(9)", "'\\t'"), ("char(10)", "'\\n'"), ("char(13)", "'\\r'")):
+        escaped = f"replace({escaped}, {raw}, {escape})"
+    array = f"""'["' || replace({escaped}, ',', '","') || '"]'"""
+    # other control characters are not valid JSON; such a string gets no tags rather than failing the write
+    return f"json_each(CASE WHEN json_valid({array}) THEN {array} ELSE '[]' END)"
+
+
+def _parts(tags: str) -> str:
+    """``SELECT`` of the trimmed, non-empty tag names in ``tags``."""
+    return f"SELECT trim(t.value, {_SPACE}) AS name FROM {_split(tags)} AS t WHERE trim(t.value, {_SPACE}) != ''"
+
+
+def _ddl(entity: str) -> list[str]:
+    table = ENTITY_MODELS[entity].__tablename__
+    link = TAG_LINKS[entity].__tablename__
+
+    def add(row: str) -> str:
+        # OR IGNORE on the links: a tag repeated in one string is linked once
+        return (
+            f"INSERT OR IGNORE INTO tag(name) {_parts(f'{row}.tags')}; "
+            f"INSERT OR IGNORE INTO {link}(tag_id, entity_id) SELECT tag.id, {row}.id "
+            f"FROM ({_parts(f'{row}.tags')}) AS p JOIN tag ON tag.name = p.name; "
+        )
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_tags_ai AFTER INSERT ON {table} WHEN new.tags != '' BEGIN "
+        f"{add('new')}END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_tags_au AFTER UPDATE OF tags ON {table} "
+        f"WHEN old.tags IS NOT new.tags BEGIN "
+        f"DELETE FROM {link} WHERE entity_id = old.id; {add('new')}END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_tags_ad AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {link} WHERE entity_id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {link}_count_ai AFTER INSERT ON {link} BEGIN "
+        f"INSERT INTO tagcount(entity, tag_id, count) VALUES ('{entity}', new.tag_id, 1) "
+        f"ON CONFLICT(entity, tag_id) DO UPDATE SET count = count + 1; END",
+        f"CREATE TRIGGER IF NOT EXISTS {link}_count_ad AFTER DELETE ON {link} BEGIN "
+        f"UPDATE tagcount SET count = count - 1 WHERE entity = '{entity}' AND tag_id = old.tag_id; "
+        f"DELETE FROM tagcount WHERE entity = '{entity}' AND tag_id = old.tag_id AND count <= 0; END",
+    ]
+
+
+def drop_tag_triggers(conn: Connection) -> None:
+    for entity in TAG_LINKS:
+        table = ENTITY_MODELS[entity].__tablename__
+        for suffix in ("ai", "au", "ad"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_tags_{suffix}"))
+
+
+def ensure_tag_index(conn: Connection) -> None:
+    """Create the tag tables and triggers that are missing."""
+    for model in (Tag, TagCount, *TAG_LINKS.values()):
+        model.__table__.create(conn, checkfirst=True)
+    for entity in TAG_LINKS:
+        for stmt in _ddl(entity):
+            conn.execute(text(stmt))
+
+
+def rebuild_tags(conn: Connection) -> None:
+    """Recompute every link and count from the ``tags`` columns."""
+    conn.execute(text("DELETE FROM tagcount"))
+    for entity, link_model in TAG_LINKS.items():
+        table = ENTITY_MODELS[entity].__tablename__
+        link = link_model.__tablename__
+        conn.execute(text(f"DELETE FROM {link}"))
+        parts = f"SELECT {table}.id AS entity_id, trim(t.value, {_SPACE}) AS name FROM {table}, {_split(f'{table}.tags')} AS t"
+        conn.execute(text(f"INSERT OR IGNORE INTO tag(name) SELECT name FROM ({parts}) WHERE name != ''"))
+        conn.execute(text(
+            f"INSERT OR IGNORE INTO {link}(tag_id, entity_id) SELECT tag.id, p.entity_id "
+            f"FROM ({parts}) AS p JOIN tag ON tag.name = p.name"
+        ))
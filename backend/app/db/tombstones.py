@@ -0,0 +1,29 @@
+"""Deletion log behind /sync.
+
+An ``AFTER DELETE`` trigger on every synced table records the entity name and
+id in ``tombstone``, so ORM deletes, bulk statements and manual cleanups all
+leave a trace. ``deleted_at`` uses the same text format SQLAlchemy stores for
+``updated_at`` (UTC, microseconds), so both compare as plain strings.
+"""
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.models.common import utcnow
+
+# strftime's %f is SS.SSS; pad to the SS.ffffff SQLAlchemy writes
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+
+def ensure_tombstone_triggers(conn: Connection, tables: dict[str, str]) -> None:
+    """``tables`` maps entity name -> table name."""
+    for entity, table in tables.items():
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_tombstone AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO tombstone(entity, entity_id, deleted_at) VALUES ('{entity}', old.id, {_NOW}); END"
+        ))
+
+
+def prune_tombstones(conn: Connection, retention_days: int) -> None:
+    conn.execute(text("DELETE FROM tombstone WHERE deleted_at < :cutoff"), {"cutoff": utcnow() - timedelta(days=retention_days)})
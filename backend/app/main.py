@@ -1,12 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .database import Base, engine
+from .core.config import settings
+from .core.security import password_hasher
+from .db.session import init_db
+from .api.maintenance_schedule import maintenance_schedule
+from .api.router import api_router
+from .api.routes.files import router as files_router
+from .api.routes.metrics import router as metrics_router
+from .core.metrics import MetricsMiddleware
 from .routers.sops import router as sops_router
 
-app = FastAPI(title="Lab MVP API")
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()  # schema migrations (a no-op once current) and per-process state
+    scheduler = asyncio.create_task(maintenance_schedule.run(settings.maintenance_refresh_seconds))
+    yield
+    scheduler.cancel()
+    password_hasher.shutdown()  # the bcrypt worker processes
+
+
+app = FastAPI(title="Lab MVP API", lifespan=lifespan)
 
 app.include_router(sops_router)
+app.include_router(api_router, prefix="/api")
+app.include_router(files_router)  # /uploads/<stored_name>
+app.include_router(metrics_router)  # /metrics (Prometheus)
+app.add_middleware(MetricsMiddleware)
 
 # run:
 # uvicorn backend.app.main:app --reload --host 127.0.0.1 --port 8000
@@ -9,4 +9,6 @@ class Attachment(TimestampMixin, SQLModel, table=True):
     filename: str
     content_type: str = Field(default="")
     stored_path: str
+    sha256: str = Field(default="", index=True)
+    size_bytes: int = Field(default=0)
     note: str = Field(default="")
@@ -0,0 +1,7 @@
+from sqlmodel import SQLModel, Field
+from app.models.common import TimestampMixin
+
+class Blob(TimestampMixin, SQLModel, table=True):
+    sha256: str = Field(primary_key=True)
+    size_bytes: int = Field(default=0)
+    ref_count: int = Field(default=0)  # Attachment + SopDocument rows pointing here
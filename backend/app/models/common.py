@@ -1,10 +1,26 @@
 from datetime import datetime, timezone
 from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from sqlmodel import SQLModel, Field
 
 def utcnow():
     return datetime.now(timezone.utc)
 
+# never taken from a client payload on update
+READONLY_FIELDS = {"id", "created_at", "updated_at"}
+
 class TimestampMixin(SQLModel):
     created_at: datetime = Field(default_factory=utcnow, index=True)
-    updated_at: datetime = Field(default_factory=utcnow, index=True)
+    updated_at: datetime = Field(default_factory=utcnow, index=True, sa_column_kwargs={"onupdate": utcnow})
+
+# the server owns the timestamps: /sync relies on updated_at for every ORM write
+@event.listens_for(TimestampMixin, "before_insert", propagate=True)
+def _stamp_insert(mapper, connection, target):
+    target.created_at = target.updated_at = utcnow()
+
+@event.listens_for(TimestampMixin, "before_update", propagate=True)
+def _stamp_update(mapper, connection, target):
+    session = object_session(target)
+    if session is None or session.is_modified(target, include_collections=False):
+        target.updated_at = utcnow()
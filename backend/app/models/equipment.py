@@ -1,5 +1,7 @@
+from datetime import date
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from app.core.compression import CompressedText
 from app.models.common import TimestampMixin
 
 class Equipment(TimestampMixin, SQLModel, table=True):
@@ -21,6 +23,9 @@ class Equipment(TimestampMixin, SQLModel, table=True):
     maintenance_cycle: str = Field(default="분기")
     last_maintenance_date: str = Field(default="")
     next_maintenance_date: str = Field(default="")
+    # typed copies, kept by app.core.maintenance (read-only for clients)
+    last_maintenance_on: Optional[date] = Field(default=None)
+    next_maintenance_on: Optional[date] = Field(default=None, index=True)
     manual_url: str = Field(default="")
     tags: str = Field(default="")
-    body_markdown: str = Field(default="")  # 카드 본문(템플릿 기반)
+    body_markdown: str = Field(default="", sa_type=CompressedText)  # 카드 본문(템플릿 기반)
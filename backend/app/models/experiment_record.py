@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from app.core.compression import CompressedText
 from app.models.common import TimestampMixin
 
 class ExperimentRecord(TimestampMixin, SQLModel, table=True):
@@ -13,11 +14,11 @@ class ExperimentRecord(TimestampMixin, SQLModel, table=True):
     status: str = Field(default="완료", index=True)
     sample_summary: str = Field(default="")
     key_parameters: str = Field(default="")
-    method_markdown: str = Field(default="")
-    results_summary: str = Field(default="")
-    conclusion: str = Field(default="")
-    issues_deviation: str = Field(default="")
-    followup_recommendations: str = Field(default="")
+    method_markdown: str = Field(default="", sa_type=CompressedText)
+    results_summary: str = Field(default="", sa_type=CompressedText)
+    conclusion: str = Field(default="", sa_type=CompressedText)
+    issues_deviation: str = Field(default="", sa_type=CompressedText)
+    followup_recommendations: str = Field(default="", sa_type=CompressedText)
     raw_data_url: str = Field(default="")
     tags: str = Field(default="")
     sop_id: Optional[int] = Field(default=None, foreign_key="sop.id", index=True)
@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from app.core.compression import CompressedText
 from app.models.common import TimestampMixin
 
 class ExperimentTemplate(TimestampMixin, SQLModel, table=True):
@@ -7,5 +8,5 @@ class ExperimentTemplate(TimestampMixin, SQLModel, table=True):
     title: str = Field(index=True)
     experiment_type: str = Field(default="기타", index=True)
     summary: str = Field(default="")
-    body_markdown: str = Field(default="")
+    body_markdown: str = Field(default="", sa_type=CompressedText)
     tags: str = Field(default="")
@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel, Field
+
+class FacetCount(SQLModel, table=True):
+    """Rows per value of an entity's filter-chip column; kept by SQLite triggers (app.db.facets)."""
+    entity: str = Field(primary_key=True)  # URL entity name, e.g. "equipment"
+    field: str = Field(primary_key=True)  # column name, e.g. "status"
+    value: str = Field(primary_key=True)
+    count: int = Field(default=0)
@@ -1,5 +1,7 @@
+from datetime import date
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from app.core.compression import CompressedText
 from app.models.common import TimestampMixin
 
 class Reagent(TimestampMixin, SQLModel, table=True):
@@ -14,6 +16,9 @@ class Reagent(TimestampMixin, SQLModel, table=True):
     light_sensitive: bool = Field(default=False)
     open_date: str = Field(default="")
     expiry_date: str = Field(default="")
+    # typed copies of the two strings above, kept by app.core.reagent_alerts (read-only for clients)
+    opened_on: Optional[date] = Field(default=None)
+    expiry_on: Optional[date] = Field(default=None, index=True)
     stock_status: str = Field(default="보통", index=True)
     min_stock: int = Field(default=0)
     qty_est: int = Field(default=0)
@@ -25,4 +30,4 @@ class Reagent(TimestampMixin, SQLModel, table=True):
     usage_summary: str = Field(default="")
     cautions: str = Field(default="")
     tags: str = Field(default="")
-    body_markdown: str = Field(default="")
+    body_markdown: str = Field(default="", sa_type=CompressedText)
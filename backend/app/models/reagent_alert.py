@@ -0,0 +1,15 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+class ReagentAlert(SQLModel, table=True):
+    """Reagents that need attention; maintained by app.core.reagent_alerts on every reagent write.
+
+    ``kind`` is "expiry" (``due_on`` = expiry date) or "low_stock" (``due_on`` empty).
+    """
+    __table_args__ = (Index("ix_reagentalert_kind_due_on", "kind", "due_on"),)
+
+    reagent_id: int = Field(foreign_key="reagent.id", primary_key=True)
+    kind: str = Field(primary_key=True)
+    due_on: Optional[date] = Field(default=None)
@@ -0,0 +1,16 @@
+"""URL entity name -> table model, shared by the generic import/export style routes."""
+from app.models.equipment import Equipment
+from app.models.experiment_record import ExperimentRecord
+from app.models.experiment_template import ExperimentTemplate
+from app.models.facility import Facility
+from app.models.reagent import Reagent
+from app.models.sop import SOP
+
+ENTITY_MODELS = {
+    "facilities": Facility,
+    "equipment": Equipment,
+    "reagents": Reagent,
+    "sops": SOP,
+    "templates": ExperimentTemplate,
+    "records": ExperimentRecord,
+}
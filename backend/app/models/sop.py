@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from app.core.compression import CompressedText
 from .common import TimestampMixin
 
 class SOP(TimestampMixin, SQLModel, table=True):
@@ -8,5 +9,5 @@ class SOP(TimestampMixin, SQLModel, table=True):
     version: str = Field(default="v1.0")
     domain: str = Field(default="공용", index=True)
     summary: str = Field(default="")
-    body_markdown: str = Field(default="")
+    body_markdown: str = Field(default="", sa_type=CompressedText)
     tags: str = Field(default="")
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlmodel import SQLModel, Field
+
+class SopDocument(SQLModel, table=True):
+    """An uploaded SOP file, served by app.routers.sops (the bytes live in the blob store)."""
+    __tablename__ = "sop_documents"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    code: Optional[str] = Field(default=None, index=True)  # SOP-001 같은 문서군 식별자(선택)
+    title: str
+    category: Optional[str] = None
+    version: Optional[str] = None
+    file_path: str
+    original_filename: str
+    mime_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    sha256: Optional[str] = Field(default=None, index=True)  # blob store key (app.core.storage)
+    created_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"server_default": func.now()})
@@ -0,0 +1,50 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+class Tag(SQLModel, table=True):
+    """Every distinct tag name used in some entity's comma-separated ``tags`` (app.db.tags)."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True)
+
+# one link table per entity, written by SQLite triggers from the ``tags`` column;
+# the (tag_id, entity_id) primary key is the inverted index: tag -> entity ids
+
+class FacilityTag(SQLModel, table=True):
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    entity_id: int = Field(foreign_key="facility.id", primary_key=True, index=True)
+
+class EquipmentTag(SQLModel, table=True):
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    entity_id: int = Field(foreign_key="equipment.id", primary_key=True, index=True)
+
+class ReagentTag(SQLModel, table=True):
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    entity_id: int = Field(foreign_key="reagent.id", primary_key=True, index=True)
+
+class SOPTag(SQLModel, table=True):
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    entity_id: int = Field(foreign_key="sop.id", primary_key=True, index=True)
+
+class ExperimentTemplateTag(SQLModel, table=True):
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    entity_id: int = Field(foreign_key="experimenttemplate.id", primary_key=True, index=True)
+
+class ExperimentRecordTag(SQLModel, table=True):
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    entity_id: int = Field(foreign_key="experimentrecord.id", primary_key=True, index=True)
+
+class TagCount(SQLModel, table=True):
+    """How many rows of ``entity`` carry the tag; kept by triggers on the link tables, read by /tags/facets."""
+    entity: str = Field(primary_key=True)  # URL entity name, e.g. "records"
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    count: int = Field(default=0)
+
+# URL entity name -> link table
+TAG_LINKS = {
+    "facilities": FacilityTag,
+    "equipment": EquipmentTag,
+    "reagents": ReagentTag,
+    "sops": SOPTag,
+    "templates": ExperimentTemplateTag,
+    "records": ExperimentRecordTag,
+}
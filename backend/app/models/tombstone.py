@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from app.models.common import utcnow
+
+class Tombstone(SQLModel, table=True):
+    """One deleted row; written by SQLite triggers (app.db.tombstones), read by /sync."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(index=True)  # URL entity name, e.g. "equipment"
+    entity_id: int
+    deleted_at: datetime = Field(default_factory=utcnow, index=True)
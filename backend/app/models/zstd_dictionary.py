@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from app.models.common import utcnow
+
+class ZstdDictionary(SQLModel, table=True):
+    """A shared compression dictionary; the newest one compresses new writes (app.db.compression)."""
+    id: Optional[int] = Field(default=None, primary_key=True)  # the key stored in every compressed value
+    data: bytes
+    raw_content: bool = Field(default=False)  # raw sample text rather than a trained dictionary
+    samples: int = Field(default=0)
+    created_at: datetime = Field(default_factory=utcnow)
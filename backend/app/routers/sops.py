@@ -1,26 +1,18 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-import os, shutil
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import os
 
-from ..database import SessionLocal
-from ..models.sop import SOP
+from ..api.file_response import file_response
+from ..core.storage import UploadTooLarge, acquire_blob, receive_blob
+from ..db.session import get_async_session, get_read_session
+from ..models.sop_document import SopDocument as SOP
 
 router = APIRouter(prefix="/api/sops", tags=["SOP"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-STORAGE_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "..", "storage", "sop")
-STORAGE_ROOT = os.path.abspath(STORAGE_ROOT)
-
 @router.get("")
-def list_sops(db: Session = Depends(get_db)):
-    rows = db.query(SOP).order_by(SOP.id.desc()).all()
+def list_sops(db: Session = Depends(get_read_session)):
+    rows = db.exec(select(SOP).order_by(SOP.id.desc())).all()
     return [
         {
             "id": r.id,
@@ -43,33 +35,29 @@ async def upload_sop(
     version: str = Form("1.0"),
     code: str | None = Form(None),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_session),
 ):
-    os.makedirs(STORAGE_ROOT, exist_ok=True)
-
-    safe_code = (code or title).replace("/", "_").replace("\\", "_").strip()
-    safe_ver = (version or "1.0").replace("/", "_").replace("\\", "_").strip()
-    save_dir = os.path.join(STORAGE_ROOT, safe_code, safe_ver)
-    os.makedirs(save_dir, exist_ok=True)
-
-    file_path = os.path.join(save_dir, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 파일은 content-addressed blob store에 저장 (같은 PDF는 한 번만 저장됨)
+    try:
+        upload = await receive_blob(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    stored = await db.run_sync(acquire_blob, upload)
 
-    st = os.stat(file_path)
     row = SOP(
         code=code,
         title=title,
         category=category,
         version=version,
-        file_path=file_path,
+        file_path=str(stored.path),
         original_filename=file.filename,
         mime_type=file.content_type,
-        size_bytes=st.st_size,
+        size_bytes=stored.size_bytes,
+        sha256=stored.sha256,
     )
     db.add(row)
-    db.commit()
-    db.refresh(row)
+    await db.commit()
+    await db.refresh(row)
 
     return {
         "id": row.id,
@@ -79,11 +67,17 @@ async def upload_sop(
         "original_filename": row.original_filename,
     }
 
-@router.get("/{sop_id}/download")
-def download_sop(sop_id: int, db: Session = Depends(get_db)):
-    row = db.query(SOP).filter(SOP.id == sop_id).first()
+@router.api_route("/{sop_id}/download", methods=["GET", "HEAD"])
+def download_sop(sop_id: int, request: Request, db: Session = Depends(get_read_session)):
+    row = db.get(SOP, sop_id)
     if not row:
         raise HTTPException(status_code=404, detail="SOP not found")
     if not os.path.exists(row.file_path):
         raise HTTPException(status_code=404, detail="File missing on server")
-    return FileResponse(row.file_path, filename=row.original_filename, media_type=row.mime_type or "application/octet-stream")
+    return file_response(
+        request,
+        row.file_path,
+        sha256=row.sha256,
+        media_type=row.mime_type or "application/octet-stream",
+        filename=row.original_filename,
+    )
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+from app.models.experiment_record import ExperimentRecord
+
+class RecordLinksIn(BaseModel):
+    record_id: int
+    equipment_ids: list[int] | None = None
+    reagent_ids: list[int] | None = None
+
+class BulkLinksIn(BaseModel):
+    items: list[RecordLinksIn]
+
+class RecordFullOut(BaseModel):
+    record: ExperimentRecord
+    # linked items as list rows: no compressed markdown bodies (app.api.json_response.list_columns)
+    equipment: list[dict]
+    reagents: list[dict]
+    attachments: list[dict]
+    sop: dict | None = None
+    template: dict | None = None
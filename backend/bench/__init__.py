@@ -0,0 +1,12 @@
+"""End-to-end API benchmark on synthetic data.
+
+    cd backend
+    pip install httpx
+    python -m bench run --records 100000 --out bench-$(git rev-parse --short HEAD).json
+    python -m bench compare bench-old.json bench-new.json
+
+``run`` builds a throwaway database of the requested size (``bench.data``),
+drives every route in ``app/api/router.py`` through an in-process ASGI client
+(``bench.runner``) and writes p50/p95/p99 latency and throughput per endpoint
+as JSON. ``compare`` diffs two such reports.
+"""
@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.config import settings
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _print_row(name: str, s: dict) -> None:
+    errors = f"  errors={s['errors']} {s['error_statuses']}" if s["errors"] else ""
+    print(f"{name:<52} p50 {s['p50_ms']:>9.2f}  p95 {s['p95_ms']:>9.2f}  p99 {s['p99_ms']:>9.2f} ms"
+          f"  {s['throughput_rps']:>8.1f} req/s{errors}", file=sys.stderr)
+
+
+def run(args: argparse.Namespace) -> int:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="labmvp-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    # the engines are created on import, so point them at the bench database first
+    settings.sqlite_path = str(workdir / "bench.db")
+    settings.upload_dir = str(workdir / "uploads")
+    settings.dev_bypass_auth = not args.real_auth
+
+    from app.core.security import create_access_token, password_hasher
+    from sqlalchemy import insert
+    from app.db.session import engine, init_db
+    from app.models.user import User
+    from bench import data, runner
+
+    started_at = datetime.now(timezone.utc)
+    try:
+        init_db()
+        started = time.perf_counter()
+        print(f"populating {args.records} records in {workdir} ...", file=sys.stderr)
+        dataset = data.populate(engine, args.records, seed=args.seed)
+        populate_seconds = time.perf_counter() - started
+        print(f"populated in {populate_seconds:.1f}s: {dataset.counts}", file=sys.stderr)
+
+        headers = None
+        if args.real_auth:
+            headers = {"Authorization": f"Bearer {create_access_token(sub='bench@example.com')}"}
+            with engine.begin() as conn:
+                conn.execute(insert(User.__table__).values(email="bench@example.com", password_hash="", name="bench"))
+        endpoints = asyncio.run(runner.run(
+            dataset, requests=args.requests, concurrency=args.concurrency, seed=args.seed,
+            headers=headers, progress=_print_row,
+        ))
+    finally:
+        password_hasher.shutdown()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "started_at": started_at.isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "records": args.records,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "real_auth": args.real_auth,
+        },
+        "dataset": {
+            "counts": dataset.counts,
+            "populate_seconds": round(populate_seconds, 2),
+            "table_seconds": {k: round(v, 2) for k, v in dataset.seconds.items()},
+        },
+        "endpoints": endpoints,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 1 if any(s["errors"] for s in endpoints.values()) else 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    for key in ("records", "requests", "concurrency"):
+        if base["meta"][key] != new["meta"][key]:
+            print(f"warning: {key} differs ({base['meta'][key]} vs {new['meta'][key]})", file=sys.stderr)
+    regressions = 0
+    print(f"{'endpoint':<52} {args.metric + ' base':>14} {'new':>10} {'ratio':>7}")
+    for name, after in new["endpoints"].items():
+        before = base["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<52} {'-':>14} {after[args.metric]:>10.2f}   (new)")
+            continue
+        ratio = after[args.metric] / before[args.metric] if before[args.metric] else 1.0
+        flag = ""
+        if ratio > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<52} {before[args.metric]:>14.2f} {after[args.metric]:>10.2f} {ratio:>7.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="populate a synthetic database and benchmark every route")
+    p.add_argument("--records", type=int, default=10_000, help="experiment records to generate (catalog scales with it)")
+    p.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    p.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workdir", help="where the bench database and uploads go (default: a temp dir)")
+    p.add_argument("--keep", action="store_true", help="keep the workdir afterwards")
+    p.add_argument("--real-auth", action="store_true", help="send a bearer token instead of the dev auth bypass")
+    p.add_argument("--out", help="write the JSON report here instead of stdout")
+    p.set_defaults(func=run)
+
+    p = sub.add_parser("compare", help="compare two reports")
+    p.add_argument("base")
+    p.add_argument("new")
+    p.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    p.add_argument("--threshold", type=float, default=1.2, help="ratio above which an endpoint counts as regressed")
+    p.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Synthetic lab data at benchmark scale.
+
+Rows reuse the template and record shapes from ``seed_templates_records_v2``
+and are written with Core ``executemany`` inserts in batches, one transaction
+per table, so a million records load in minutes rather than hours. Derived
+columns (reagent alerts, maintenance dates) are filled in afterwards the same
+way ``init_db`` backfills them.
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterable, Iterator
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.core.maintenance import refresh_maintenance
+from app.core.reagent_alerts import refresh_reagent_alerts
+from app.db.compression import ensure_dictionary
+from app.db.search_index import rebuild_search_index
+from app.models.common import utcnow
+from app.models.equipment import Equipment
+from app.models.experiment_record import ExperimentRecord
+from app.models.experiment_template import ExperimentTemplate
+from app.models.facility import Facility
+from app.models.link_tables import RecordEquipmentLink, RecordReagentLink
+from app.models.reagent import Reagent
+from app.models.sop import SOP
+from seed_templates_records_v2 import RECORDS, TEMPLATES
+
+BATCH_SIZE = 5000
+
+FACILITY_TYPES = ["세포배양실", "분자생물실", "이미징실", "동물실", "공용실험실"]
+BSL_LEVELS = ["해당없음", "BSL-1", "BSL-2"]
+DOMAINS = ["세포", "분자", "단백질", "이미징", "공용"]
+EQUIPMENT_NAMES = ["원심분리기", "CO2 인큐베이터", "qPCR 장비", "클린벤치", "형광현미경", "플레이트 리더", "-80 냉동고", "PCR 기기"]
+EQUIPMENT_STATUSES = ["사용중", "사용중", "사용중", "점검중", "고장"]
+CYCLES = ["주간", "월", "분기", "분기", "반기", "연", "비정기", "6개월"]
+REAGENT_NAMES = ["Trypsin-EDTA", "DMEM", "FBS", "PBS", "SYBR Green Master Mix", "RNA 추출 키트", "DAPI", "BSA"]
+STORAGE_TEMPS = ["RT", "4℃", "-20℃", "-80℃"]
+STOCK_STATUSES = ["충분", "충분", "보통", "부족", "없음"]
+PERFORMERS = ["홍길동", "김연구", "이실험", "박분석", "최배양"]
+PROJECTS = ["Pilot", "Drug A", "Biomarker", "Method dev"]
+
+
+@dataclass
+class Dataset:
+    """Row counts per table; ids of a fresh database run 1..count."""
+
+    counts: dict[str, int]
+    seconds: dict[str, float] = field(default_factory=dict)
+
+    def random_id(self, rng: random.Random, entity: str) -> int:
+        return rng.randint(1, self.counts[entity])
+
+
+def scale(records: int) -> dict[str, int]:
+    """Catalog sizes that grow with the record count (a lab with 1M records has ~20k instruments)."""
+    return {
+        "facilities": max(20, records // 500),
+        "sops": max(20, records // 1000),
+        "templates": max(len(TEMPLATES), records // 2000),
+        "equipment": max(100, records // 50),
+        "reagents": max(200, records // 10),
+        "records": records,
+    }
+
+
+def _date_text(rng: random.Random, day: date) -> str:
+    # the free-text date fields see all of these in real data
+    return rng.choice([day.isoformat(), day.strftime("%Y.%m.%d"), f"{day.year}년 {day.month}월 {day.day}일"])
+
+
+def _facilities(rng: random.Random, n: int) -> Iterator[dict]:
+    for i in range(1, n + 1):
+        yield dict(
+            name=f"{rng.choice(FACILITY_TYPES)} {i}",
+            facility_type=rng.choice(FACILITY_TYPES),
+            location=f"{rng.randint(1, 12)}층 {rng.randint(100, 999)}호",
+            bsl_level=rng.choice(BSL_LEVELS),
+            manager=rng.choice(PERFORMERS),
+            rules_summary="출입 기록, 개인보호구 착용, 퇴실 시 정리",
+            tags="시설,bench",
+        )
+
+
+def _sops(rng: random.Random, n: int) -> Iterator[dict]:
+    for i in range(1, n + 1):
+        template = TEMPLATES[i % len(TEMPLATES)]
+        yield dict(
+            title=f"SOP {i}: {template['experiment_type']} 표준 절차",
+            version=f"v{rng.randint(1, 3)}.{rng.randint(0, 9)}",
+            domain=rng.choice(DOMAINS),
+            summary=template["summary"],
+            body_markdown=template["body_markdown"],
+            tags=template["tags"],
+        )
+
+
+def _templates(rng: random.Random, n: int) -> Iterator[dict]:
+    for i in range(1, n + 1):
+        template = TEMPLATES[(i - 1) % len(TEMPLATES)]
+        yield {**template, "title": f"{template['title']} #{i}"}
+
+
+def _equipment(rng: random.Random, n: int, facilities: int) -> Iterator[dict]:
+    today = date.today()
+    for i in range(1, n + 1):
+        yield dict(
+            name=f"{rng.choice(EQUIPMENT_NAMES)} {i}",
+            model_vendor=f"Vendor {rng.randint(1, 40)}",
+            asset_no=f"EQ-{i:07d}",
+            status=rng.choice(EQUIPMENT_STATUSES),
+            domain=rng.choice(DOMAINS),
+            facility_id=rng.randint(1, facilities),
+            owner=rng.choice(PERFORMERS),
+            maintenance_cycle=rng.choice(CYCLES),
+            last_maintenance_date=_date_text(rng, today - timedelta(days=rng.randint(0, 400))),
+            tags="장비,bench",
+            body_markdown="## 사용 전 점검\n- 전원/소음 확인\n\n## 사용 후\n- 70% EtOH 청소",
+        )
+
+
+def _reagents(rng: random.Random, n: int) -> Iterator[dict]:
+    today = date.today()
+    for i in range(1, n + 1):
+        yield dict(
+            name=f"{rng.choice(REAGENT_NAMES)} {i}",
+            vendor=f"Vendor {rng.randint(1, 40)}",
+            cat_no=f"CAT-{rng.randint(1000, 99999)}",
+            lot_no=f"LOT{i:08d}",
+            storage_temp=rng.choice(STORAGE_TEMPS),
+            storage_location=f"냉장고 {rng.randint(1, 20)}-{rng.randint(1, 5)}",
+            expiry_date=_date_text(rng, today + timedelta(days=rng.randint(-60, 720))),
+            stock_status=rng.choice(STOCK_STATUSES),
+            tags="시약,bench",
+        )
+
+
+def _records(rng: random.Random, n: int, counts: dict[str, int]) -> Iterator[dict]:
+    start = date.today() - timedelta(days=3 * 365)
+    for i in range(1, n + 1):
+        record = RECORDS[i % len(RECORDS)]
+        yield {
+            **record,
+            "title": f"{record['title']} #{i}",
+            "date": (start + timedelta(days=rng.randint(0, 3 * 365))).isoformat(),
+            "performer": rng.choice(PERFORMERS),
+            "project": rng.choice(PROJECTS),
+            "sop_id": rng.randint(1, counts["sops"]) if rng.random() < 0.7 else None,
+            "template_id": rng.randint(1, counts["templates"]),
+        }
+
+
+def _links(rng: random.Random, records: int, targets: int, target: str, most: int) -> Iterator[dict]:
+    for record_id in range(1, records + 1):
+        for target_id in rng.sample(range(1, targets + 1), rng.randint(0, min(most, targets))):
+            yield {"record_id": record_id, target: target_id}
+
+
+def _stamped(rows: Iterable[dict]) -> Iterator[dict]:
+    for row in rows:
+        now = utcnow()
+        yield {**row, "created_at": now, "updated_at": now}
+
+
+def _bulk_insert(engine: Engine, table, rows: Iterable[dict]) -> int:
+    count = 0
+    with engine.begin() as conn:
+        while batch := list(islice(rows, BATCH_SIZE)):
+            conn.execute(insert(table), batch)
+            count += len(batch)
+    return count
+
+
+def populate(engine: Engine, records: int, seed: int = 0) -> Dataset:
+    """Fill an empty database with ``records`` records and a catalog to match."""
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(ExperimentRecord.__table__)).scalar():
+            raise RuntimeError("bench needs an empty database (ids are assumed to start at 1)")
+
+    rng = random.Random(seed)
+    counts = scale(records)
+    dataset = Dataset(counts=dict(counts))
+    tables = [
+        ("facilities", Facility, _facilities(rng, counts["facilities"])),
+        ("sops", SOP, _sops(rng, counts["sops"])),
+        ("templates", ExperimentTemplate, _templates(rng, counts["templates"])),
+        ("equipment", Equipment, _equipment(rng, counts["equipment"], counts["facilities"])),
+        ("reagents", Reagent, _reagents(rng, counts["reagents"])),
+        ("records", ExperimentRecord, _records(rng, records, counts)),
+    ]
+    for entity, model, rows in tables:
+        started = time.perf_counter()
+        _bulk_insert(engine, model.__table__, _stamped(rows))
+        dataset.seconds[entity] = time.perf_counter() - started
+
+    for entity, model, target, most, count in (
+        ("equipment_links", RecordEquipmentLink, "equipment_id", 3, counts["equipment"]),
+        ("reagent_links", RecordReagentLink, "reagent_id", 5, counts["reagents"]),
+    ):
+        started = time.perf_counter()
+        dataset.counts[entity] = _bulk_insert(engine, model.__table__, _links(rng, records, count, target, most))
+        dataset.seconds[entity] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        refresh_reagent_alerts(conn)
+        refresh_maintenance(conn)
+    dataset.seconds["derived"] = time.perf_counter() - started
+
+    # what init_db does on a real database's first start with data: train the dictionary, recompress
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        ensure_dictionary(conn)
+    dataset.seconds["compression"] = time.perf_counter() - started
+
+    # Core inserts skip the app-fed search indexes (equipment, reagents, records)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+    dataset.seconds["search"] = time.perf_counter() - started
+    return dataset
@@ -0,0 +1,315 @@
+"""Drive every API route in-process and measure it.
+
+Requests go through ``httpx.ASGITransport`` straight into the FastAPI app, so
+the numbers cover routing, validation, the database and serialization but no
+network. Each scenario runs ``requests`` times with ``concurrency`` requests in
+flight; write scenarios create their own rows and later ones update and
+delete exactly those, so the dataset stays the same size across a run.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import JSONResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.pagination import encode_cursor
+from app.api.router import api_router
+from app.api.routes.sync import TOMBSTONES
+from app.api.routes.files import router as files_router
+from app.api.routes.metrics import router as metrics_router
+from app.core.metrics import MetricsMiddleware
+from app.db.session import get_async_read_session
+from app.models.common import utcnow
+from app.models.experiment_record import ExperimentRecord
+from app.models.registry import ENTITY_MODELS
+from bench.data import Dataset
+
+RequestSpec = dict[str, Any]  # kwargs for httpx.AsyncClient.request
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random], RequestSpec]
+    expect: tuple[int, ...] = (200,)
+    requests: Optional[int] = None  # overrides the run-wide count (bcrypt, full exports)
+    after: Optional[Callable[[httpx.Response], None]] = None
+
+
+@dataclass
+class Result:
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+    wall: float = 0.0
+
+
+# the records list as it was served before app.api.json_response: ORM instances through
+# response_model and Starlette's JSONResponse, for comparison with GET /api/records/
+response_model_router = APIRouter()
+
+
+@response_model_router.get("/records/", response_model=list[ExperimentRecord], response_class=JSONResponse)
+async def list_records_response_model(limit: int = 50, session: AsyncSession = Depends(get_async_read_session)):
+    return (await session.exec(select(ExperimentRecord).order_by(ExperimentRecord.id.desc()).limit(limit))).all()
+
+
+def build_app() -> FastAPI:
+    """The API as app.main mounts it, minus the legacy SOP document router, plus the bench-only routes."""
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.include_router(response_model_router, prefix="/bench/response-model")
+    app.include_router(files_router)
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(result: Result) -> dict:
+    ms = sorted(v * 1000 for v in result.latencies)
+    count = len(ms)
+    return {
+        "requests": count,
+        "errors": sum(result.errors.values()),
+        "error_statuses": result.errors,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(sum(ms) / count, 3) if count else 0.0,
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+        "throughput_rps": round(count / result.wall, 1) if result.wall else 0.0,
+    }
+
+
+def scenarios(ds: Dataset, requests: int) -> list[Scenario]:
+    """One scenario per route (list routes also get a filtered variant), in a safe order."""
+    created: dict[str, list[int]] = {e: [] for e in ("facilities", "equipment", "reagents", "sops", "templates", "records")}
+    attachments: list[dict] = []
+    state: dict[str, Any] = {}
+    started = utcnow().replace(tzinfo=None)
+    few = min(requests, 20)
+
+    def remember(entity: str) -> Callable[[httpx.Response], None]:
+        return lambda r: created[entity].append(r.json()["id"])
+
+    def take(entity: str) -> Callable[[random.Random], int]:
+        # 0 is never an id: a failed create shows up as 404s here instead of a crash
+        return lambda rng: created[entity].pop() if created[entity] else 0
+
+    def pick(entity: str) -> Callable[[random.Random], int]:
+        return lambda rng: rng.choice(created[entity])
+
+    payloads: dict[str, Callable[[random.Random], dict]] = {
+        "facilities": lambda rng: {"name": f"bench facility {rng.random()}", "facility_type": "공용실험실"},
+        "equipment": lambda rng: {"name": f"bench equipment {rng.random()}", "maintenance_cycle": "분기",
+                                  "last_maintenance_date": "2026.01.15", "facility_id": ds.random_id(rng, "facilities")},
+        "reagents": lambda rng: {"name": f"bench reagent {rng.random()}", "expiry_date": "2027-03-01", "stock_status": "부족"},
+        "sops": lambda rng: {"title": f"bench sop {rng.random()}", "body_markdown": "## 절차\n1. 준비"},
+        "templates": lambda rng: {"title": f"bench template {rng.random()}", "experiment_type": "qPCR"},
+        "records": lambda rng: {"title": f"bench record {rng.random()}", "experiment_type": "qPCR",
+                                "template_id": ds.random_id(rng, "templates")},
+    }
+    list_filters = {
+        "facilities": {"facility_type": "세포배양실"},
+        "equipment": {"status": "점검중"},
+        "reagents": {"storage_temp": "-20℃"},
+        "sops": {"domain": "분자"},
+        "templates": {"experiment_type": "qPCR"},
+        "records": {"experiment_type": "세포배양"},
+    }
+
+    out: list[Scenario] = []
+
+    # auth: bcrypt dominates, so fewer iterations
+    def register(rng: random.Random) -> RequestSpec:
+        state["users"] = state.get("users", 0) + 1
+        return {"method": "POST", "url": "/api/auth/register",
+                "json": {"email": f"bench{state['users']}@example.com", "password": "bench-password", "name": "bench"}}
+
+    out += [
+        Scenario("POST /api/auth/register", register, requests=few),
+        Scenario("POST /api/auth/login", lambda rng: {"method": "POST", "url": "/api/auth/login",
+                 "json": {"email": f"bench{rng.randint(1, state['users'])}@example.com", "password": "bench-password"}},
+                 requests=few),
+        Scenario("GET /api/auth/hasher-stats", lambda rng: {"method": "GET", "url": "/api/auth/hasher-stats"}),
+        Scenario("GET /metrics", lambda rng: {"method": "GET", "url": "/metrics"}),
+        Scenario("GET /api/admin/queries", lambda rng: {"method": "GET", "url": "/api/admin/queries"}, requests=few),
+    ]
+
+    for entity in created:
+        base = f"/api/{entity}"
+        out += [
+            Scenario(f"GET {base}/", lambda rng, base=base: {"method": "GET", "url": f"{base}/", "params": {"limit": 50}}),
+            Scenario(f"GET {base}/?<filter>", lambda rng, base=base, f=list_filters[entity]:
+                     {"method": "GET", "url": f"{base}/", "params": {**f, "limit": 50}}),
+            Scenario(f"GET {base}/facets", lambda rng, base=base: {"method": "GET", "url": f"{base}/facets"}),
+            Scenario(f"GET {base}/facets?<filter>", lambda rng, base=base, f=list_filters[entity]:
+                     {"method": "GET", "url": f"{base}/facets", "params": f}),
+            Scenario(f"GET {base}/{{id}}", lambda rng, base=base, entity=entity:
+                     {"method": "GET", "url": f"{base}/{ds.random_id(rng, entity)}"}),
+            Scenario(f"POST {base}/", lambda rng, base=base, p=payloads[entity]:
+                     {"method": "POST", "url": f"{base}/", "json": p(rng)}, after=remember(entity)),
+            Scenario(f"PUT {base}/{{id}}", lambda rng, base=base, entity=entity, p=payloads[entity]:
+                     {"method": "PUT", "url": f"{base}/{pick(entity)(rng)}", "json": p(rng)}),
+        ]
+        if entity == "equipment":
+            out.append(Scenario("GET /api/equipment/maintenance-due", lambda rng: {
+                "method": "GET", "url": "/api/equipment/maintenance-due", "params": {"within_days": rng.choice([7, 30, 90])}}))
+        if entity == "reagents":
+            out.append(Scenario("GET /api/reagents/alerts", lambda rng: {
+                "method": "GET", "url": "/api/reagents/alerts", "params": {"within_days": rng.choice([7, 30, 90])}}))
+        if entity == "records":
+            out += [
+                # the largest page a list route serves: dominated by row -> JSON encoding
+                Scenario("GET /api/records/ (1000 rows)", lambda rng: {
+                    "method": "GET", "url": "/api/records/", "params": {"limit": 1000}}, requests=few),
+                # the same pages through the old response_model path
+                Scenario("GET /api/records/ (response_model)", lambda rng: {
+                    "method": "GET", "url": "/bench/response-model/records/", "params": {"limit": 50}}),
+                Scenario("GET /api/records/ (1000 rows, response_model)", lambda rng: {
+                    "method": "GET", "url": "/bench/response-model/records/", "params": {"limit": 1000}}, requests=few),
+                Scenario("GET /api/records/{id}/equipment-ids", lambda rng: {
+                    "method": "GET", "url": f"/api/records/{ds.random_id(rng, 'records')}/equipment-ids"}),
+                Scenario("GET /api/records/{id}/reagent-ids", lambda rng: {
+                    "method": "GET", "url": f"/api/records/{ds.random_id(rng, 'records')}/reagent-ids"}),
+                Scenario("GET /api/records/{id}/full", lambda rng: {
+                    "method": "GET", "url": f"/api/records/{ds.random_id(rng, 'records')}/full"}),
+                # link writes only touch records this run created
+                Scenario("POST /api/records/set-links", lambda rng: {"method": "POST", "url": "/api/records/set-links", "json": {
+                    "items": [{"record_id": rid,
+                               "equipment_ids": [ds.random_id(rng, "equipment") for _ in range(2)],
+                               "reagent_ids": [ds.random_id(rng, "reagents") for _ in range(3)]}
+                              for rid in rng.sample(created["records"], min(10, len(created["records"])))]}}),
+                Scenario("POST /api/records/{id}/set-equipment", lambda rng: {
+                    "method": "POST", "url": f"/api/records/{pick('records')(rng)}/set-equipment",
+                    "json": {"ids": [ds.random_id(rng, "equipment") for _ in range(3)]}}),
+                Scenario("POST /api/records/{id}/set-reagents", lambda rng: {
+                    "method": "POST", "url": f"/api/records/{pick('records')(rng)}/set-reagents",
+                    "json": {"ids": [ds.random_id(rng, "reagents") for _ in range(5)]}}),
+            ]
+
+    # uploads hang off the records created above, before they are deleted
+    def upload(rng: random.Random) -> RequestSpec:
+        return {"method": "POST", "url": "/api/uploads/",
+                "params": {"entity_type": "record", "entity_id": pick("records")(rng)},
+                "files": {"file": ("bench.bin", os.urandom(16 * 1024), "application/octet-stream")}}
+
+    def by_hash(rng: random.Random) -> RequestSpec:
+        att = rng.choice(attachments)
+        return {"method": "POST", "url": "/api/uploads/by-hash",
+                "params": {"entity_type": "record", "entity_id": pick("records")(rng),
+                           "sha256": att["sha256"], "filename": "bench-copy.bin"}}
+
+    out += [
+        Scenario("POST /api/uploads/", upload, after=lambda r: attachments.append(r.json())),
+        Scenario("POST /api/uploads/by-hash", by_hash, after=lambda r: attachments.append(r.json())),
+        Scenario("GET /api/uploads/{entity_type}/{entity_id}", lambda rng: {
+            "method": "GET", "url": f"/api/uploads/record/{pick('records')(rng)}"}),
+        Scenario("GET /uploads/{stored_name}", lambda rng: {"method": "GET", "url": rng.choice(attachments)["url"]}),
+        Scenario("DELETE /api/uploads/{attachment_id}", lambda rng: {
+            "method": "DELETE", "url": f"/api/uploads/{attachments.pop()['id']}"}),
+    ]
+
+    words = ["qPCR", "IL6", "passage", "세포", "Trypsin", "원심분리기", "Drug", "melt"]
+    out.append(Scenario("GET /api/search/", lambda rng: {"method": "GET", "url": "/api/search/",
+                                                         "params": {"q": rng.choice(words), "limit": 20}}))
+    out += [
+        Scenario("GET /api/records/?tag=&tag=", lambda rng: {"method": "GET", "url": "/api/records/",
+                 "params": {"tag": ["qPCR", "IL6"], "limit": 50}}),
+        Scenario("GET /api/records/?tag=&tag_match=any", lambda rng: {"method": "GET", "url": "/api/records/",
+                 "params": {"tag": ["qPCR", "passage"], "tag_match": "any", "limit": 50}}),
+        Scenario("GET /api/tags/facets", lambda rng: {"method": "GET", "url": "/api/tags/facets"}),
+    ]
+
+    def import_batch(rng: random.Random) -> RequestSpec:
+        lines = (json.dumps(payloads["reagents"](rng), ensure_ascii=False) for _ in range(100))
+        return {"method": "POST", "url": "/api/import/reagents", "content": "\n".join(lines).encode(),
+                "headers": {"content-type": "application/x-ndjson"}}
+
+    out += [
+        Scenario("POST /api/import/{entity} (100 rows)", import_batch, requests=few),
+        Scenario("GET /api/export/{entity} (facilities)", lambda rng: {"method": "GET", "url": "/api/export/facilities"},
+                 requests=min(requests, 10)),
+        Scenario("GET /api/export/{entity} (records by template)", lambda rng: {
+            "method": "GET", "url": "/api/export/records",
+            "params": {"template_id": ds.random_id(rng, "templates"), "fields": "id,title,date,status"}},
+                 requests=min(requests, 10)),
+    ]
+
+    # a client that last synced when the run started: it gets the rows this run wrote
+    since = encode_cursor([[source, started.isoformat(), 0] for source in [*ENTITY_MODELS, TOMBSTONES]])
+    out += [
+        Scenario("GET /api/sync/ (full, first page)", lambda rng: {"method": "GET", "url": "/api/sync/", "params": {"limit": 500}},
+                 requests=min(requests, 20)),
+        Scenario("GET /api/sync/?since=", lambda rng: {"method": "GET", "url": "/api/sync/",
+                                                      "params": {"since": since, "limit": 500}}),
+    ]
+
+    for entity in created:
+        out.append(Scenario(f"DELETE /api/{entity}/{{id}}", lambda rng, entity=entity: {
+            "method": "DELETE", "url": f"/api/{entity}/{take(entity)(rng)}"}))
+    # children before parents: records reference templates and sops
+    order = ["records", "reagents", "equipment", "templates", "sops", "facilities"]
+    deletes = sorted((s for s in out if s.name.startswith("DELETE /api/") and "uploads" not in s.name),
+                     key=lambda s: order.index(s.name.split("/")[2]))
+    return [s for s in out if s not in deletes] + deletes
+
+
+async def _run_scenario(client: httpx.AsyncClient, scenario: Scenario, count: int, concurrency: int,
+                        rng: random.Random) -> Result:
+    result = Result()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            spec = scenario.build(rng)
+            started = time.perf_counter()
+            response = await client.request(**spec)
+            result.latencies.append(time.perf_counter() - started)
+        if response.status_code not in scenario.expect:
+            result.errors[str(response.status_code)] = result.errors.get(str(response.status_code), 0) + 1
+        elif scenario.after:
+            scenario.after(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    result.wall = time.perf_counter() - started
+    return result
+
+
+async def run(ds: Dataset, requests: int = 200, concurrency: int = 8, seed: int = 0,
+              headers: Optional[dict] = None,
+              progress: Optional[Callable[[str, dict], None]] = None) -> dict[str, dict]:
+    """Run every scenario in order and return ``{scenario name: summary}``."""
+    rng = random.Random(seed)
+    transport = httpx.ASGITransport(app=build_app())
+    report: dict[str, dict] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+        # untimed: first-request work (dev user, pool connections) is not what we measure
+        await client.get("/api/auth/hasher-stats")
+        await client.get("/api/facilities/", params={"limit": 1})
+        for scenario in scenarios(ds, requests):
+            summary = summarize(await _run_scenario(client, scenario, scenario.requests or requests, concurrency, rng))
+            report[scenario.name] = summary
+            if progress:
+                progress(scenario.name, summary)
+    return report
+
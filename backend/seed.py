@@ -3,6 +3,8 @@ Run:
     python seed.py
 """
 from sqlmodel import Session, select
+from app.core.maintenance import refresh_maintenance
+from app.core.reagent_alerts import refresh_reagent_alerts
 from app.db.session import engine, init_db
 from app.models.facility import Facility
 from app.models.equipment import Equipment
@@ -89,4 +91,8 @@ with Session(engine) as session:
         session.commit()
         session.add_all(RECORDS)
         session.commit()
+        # derived tables the API routes keep up to date on their own writes
+        with engine.begin() as conn:
+            refresh_reagent_alerts(conn)
+            refresh_maintenance(conn)
         print("Seeded.")
@@ -1,8 +1,5 @@
 """Seed defaults: templates + example records (qPCR / cell culture)
 
-Fix: ensures ALL referenced tables are registered in SQLModel.metadata
-so ForeignKeys like experimentrecord.sop_id -> sop.id resolve correctly.
-
 Usage (PowerShell):
     cd D:\coding\my_lab\backend
     .\.venv\Scripts\Activate.ps1
@@ -11,21 +8,12 @@ Usage (PowerShell):
 """
 from sqlmodel import Session, select
 
-# ✅ IMPORTANT: import ALL models so their tables are registered in metadata
-from app.models.user import User  # noqa:F401
-from app.models.facility import Facility  # noqa:F401
-from app.models.equipment import Equipment  # noqa:F401
-from app.models.reagent import Reagent  # noqa:F401
-from app.models.sop import SOP  # noqa:F401
-from app.models.attachment import Attachment  # noqa:F401
-from app.models.link_tables import RecordEquipmentLink, RecordReagentLink  # noqa:F401
+# app.db.session registers every table (app.db.migrations), so FKs like experimentrecord.sop_id resolve
 from app.models.experiment_template import ExperimentTemplate
 from app.models.experiment_record import ExperimentRecord
 
 from app.db.session import engine, init_db
 
-init_db()
-
 TEMPLATES = [
     dict(
         title="공통 실험기록 템플릿 (MVP)",
@@ -252,8 +240,10 @@ def upsert_records(session: Session, template_map: dict[str, int]) -> None:
         session.commit()
 
 
-with Session(engine) as session:
-    tmap = upsert_templates(session)
-    upsert_records(session, tmap)
+if __name__ == "__main__":  # TEMPLATES/RECORDS are also reused by bench.data
+    init_db()
+    with Session(engine) as session:
+        tmap = upsert_templates(session)
+        upsert_records(session, tmap)
 
-print("✅ Seeded templates + example records (if missing).")
+    print("✅ Seeded templates + example records (if missing).")
@@ -0,0 +1,44 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import QueryParams
+
+from app.api.filters import _coerce, filter_columns, filter_conditions
+from app.models.registry import ENTITY_MODELS
+
+SAMPLES = {str: "x", int: "1", float: "1.5", bool: "false", date: "2025-01-01", datetime: "2025-01-01T09:30:00"}
+
+
+
+def python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:  # treated as text by _coerce
+        return str
+
+
+COLUMNS = [
+    pytest.param(model, column, id=f"{entity}.{name}")
+    for entity, model in ENTITY_MODELS.items()
+    for name, column in filter_columns(model).items()
+]
+
+
+@pytest.mark.parametrize("model, column", COLUMNS)
+def test_every_filter_column_accepts_a_valid_value(model, column):
+    assert len(filter_conditions(model, QueryParams({column.name: SAMPLES[python_type(column)]}))) == 1
+
+
+@pytest.mark.parametrize("model, column", [c for c in COLUMNS if python_type(c.values[1]) is not str])
+def test_every_typed_filter_column_rejects_garbage_with_400(model, column):
+    with pytest.raises(HTTPException) as exc:
+        filter_conditions(model, QueryParams({column.name: "not-a-value"}))
+    assert exc.value.status_code == 400
+
+
+def test_coerce_parses_dates_and_bools():
+    reagent = ENTITY_MODELS["reagents"].__table__.c
+    assert _coerce(reagent.expiry_on, "2025-01-01") == date(2025, 1, 1)
+    column = type("Column", (), {"name": "flag", "type": type("T", (), {"python_type": bool})()})()
+    assert [_coerce(column, v) for v in ("true", "1", "FALSE", "0")] == [True, True, False, False]
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timezone
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_current_user
+from app.api.json_response import dumps, list_columns, row_columns
+from app.api.response_cache import response_cache
+from app.api.router import api_router
+from app.db.migrations import MIGRATIONS  # noqa: F401  (imports every table model)
+from app.db.session import get_async_read_session
+from app.models.registry import ENTITY_MODELS
+
+# old enough for /sync to hand out; microseconds exercise the datetime encoding
+STAMP = datetime(2025, 3, 9, 14, 5, 7, 123456)
+# long enough that CompressedText columns store it compressed
+TEXT = '세포배양 -80℃ µL "quoted" \\ back\nline 🧪 ' * 4
+JSON = TypeAdapter(Any)
+
+
+def row(model, n: int) -> dict:
+    """Every column of one row: text fields in unicode, optional ones left None on odd rows."""
+    values = {}
+    for name, field in model.model_fields.items():
+        if name == "id":
+            continue
+        if not field.is_required() and field.default is None and n % 2:
+            values[name] = None
+        elif field.annotation in (str, "str"):
+            values[name] = f"{TEXT} {n}"
+    data = model(**values).model_dump()
+    data.update(created_at=STAMP, updated_at=STAMP)
+    return data
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for model in ENTITY_MODELS.values():
+            # Core inserts: the ORM would restamp created_at/updated_at
+            conn.execute(insert(model.__table__), [row(model, n) for n in range(4)])
+    read_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def read_session():
+        async with AsyncSession(read_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.dependency_overrides[get_async_read_session] = read_session
+    app.dependency_overrides[get_current_user] = lambda: None
+    for entity in ENTITY_MODELS:
+        response_cache.invalidate(entity)
+    with TestClient(app) as c, Session(engine) as session:
+        c.session = session
+        yield c
+    engine.dispose()
+
+
+def validated(session, model, ids) -> list:
+    by_id = {o.id: o for o in session.exec(select(model).where(model.id.in_(ids)))}
+    return [model.model_validate(by_id[i]) for i in ids]
+
+
+@pytest.mark.parametrize("entity", ENTITY_MODELS)
+def test_list_matches_model_dump_json(client, entity):
+    # lists leave the compressed bodies out; everything else is as pydantic writes it
+    model = ENTITY_MODELS[entity]
+    bodies = {c.name for c in row_columns(model)} - {c.name for c in list_columns(model)}
+    r = client.get(f"/api/{entity}/")
+    assert r.status_code == 200
+    ids = [item["id"] for item in r.json()]
+    assert len(ids) == 4
+    items = validated(client.session, model, ids)
+    assert r.content == TypeAdapter(list[model]).dump_json(items, exclude={"__all__": bodies})
+
+
+def test_sync_matches_model_dump_json(client):
+    r = client.get("/api/sync/")
+    assert r.status_code == 200
+    body = r.json()
+    expected = {
+        "cursor": body["cursor"],
+        "has_more": False,
+        "changes": {entity: validated(client.session, ENTITY_MODELS[entity], [item["id"] for item in items])
+                    for entity, items in body["changes"].items()},
+        "deleted": {},
+    }
+    assert list(body["changes"]) == list(ENTITY_MODELS)
+    assert r.content == JSON.dump_json(expected)
+
+
+@pytest.mark.parametrize("value", [
+    [0.1, 1e-7, 2.5e-5, 1e16, 1e20, 3e300, -0.0, 1.0, 123456789.125],
+    [datetime(2025, 3, 9, 14, 5, 7, 123456), datetime(2025, 3, 9, tzinfo=timezone.utc), date(2025, 3, 9)],
+    {"none": None, "text": TEXT, "empty": ""},
+])
+def test_dumps_matches_pydantic(value):
+    assert dumps(value) == JSON.dump_json(value)
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.db.migrations import MIGRATIONS  # noqa: F401  (imports every table model)
+from app.db.search_index import highlights, match_expression, rebuild_search_index, search_ids, ensure_search_index
+from app.models.experiment_record import ExperimentRecord
+
+FILLER = "\n".join(f"- step {i}: incubate, wash, spin down" for i in range(20))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        SQLModel.metadata.create_all(conn)
+        ensure_search_index(conn)
+    yield engine
+    engine.dispose()
+
+
+def find(engine, q):
+    with engine.connect() as conn:
+        return [h["id"] for h in search_ids(conn, "records", match_expression(q), 20, 0)]
+
+
+def add(engine, **fields) -> int:
+    with Session(engine) as session:
+        record = ExperimentRecord(title="r", **fields)
+        session.add(record)
+        session.commit()
+        return record.id
+
+
+def test_compressed_bodies_are_searchable(engine):
+    rid = add(engine, method_markdown=f"## 방법\nTrypsin 처리\n{FILLER}")
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT typeof(method_markdown) FROM experimentrecord WHERE id = :id"), {"id": rid})
+        assert stored.scalar_one() == "blob"
+    assert find(engine, "trypsin") == [rid]
+    marks = highlights("records", match_expression("trypsin"), [
+        {"id": rid, "title": "r", "tags": "", "purpose": "", "method_markdown": f"Trypsin 처리\n{FILLER}",
+         "results_summary": ""},
+    ])
+    assert "<mark>Trypsin</mark>" in marks[rid]["snippet"]
+
+
+def test_orm_writes_keep_the_index(engine):
+    rid = add(engine, method_markdown=f"Trypsin\n{FILLER}")
+    other = add(engine, method_markdown=f"Trypsin too\n{FILLER}")
+    with Session(engine) as session:
+        record = session.get(ExperimentRecord, rid)
+        record.method_markdown = f"Accutase\n{FILLER}"
+        session.commit()
+    assert find(engine, "trypsin") == [other]
+    assert find(engine, "accutase") == [rid]
+
+    with Session(engine) as session:
+        record = session.get(ExperimentRecord, rid)
+        record.status = "진행"  # not indexed: the index is left alone
+        session.commit()
+        session.delete(session.get(ExperimentRecord, other))
+        session.commit()
+    assert find(engine, "trypsin") == []
+    assert find(engine, "accutase") == [rid]
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO experimentrecord_fts(experimentrecord_fts) VALUES ('integrity-check')"))
+
+
+def test_rows_from_other_tools_join_on_rebuild(engine):
+    with engine.begin() as conn:
+        required = [c.name for c in ExperimentRecord.__table__.c if not c.nullable and c.name != "id"]
+        values = ", ".join("CURRENT_TIMESTAMP" if n.endswith("_at") else "'passage'" for n in required)
+        conn.execute(text(f"INSERT INTO experimentrecord({', '.join(required)}) VALUES ({values})"))
+    assert find(engine, "passage") == []
+
+    # an app write to a row the index never saw must not corrupt it
+    with Session(engine) as session:
+        record = session.get(ExperimentRecord, 1)
+        record.title = "Passage 12"
+        session.commit()
+    assert find(engine, "passage") == [1]
+
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+        conn.execute(text("INSERT INTO experimentrecord_fts(experimentrecord_fts) VALUES ('integrity-check')"))
+    assert find(engine, "passage") == [1]
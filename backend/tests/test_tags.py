@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+from sqlmodel import SQLModel, create_engine
+
+from app.db.migrations import MIGRATIONS  # noqa: F401  (imports every table model)
+from app.db.tags import ensure_tag_index, rebuild_tags
+from app.models.experiment_record import ExperimentRecord
+
+
+@pytest.fixture
+def db(tmp_path):
+    # a bare engine: none of the functions app.db.session registers on its connections
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        SQLModel.metadata.create_all(conn)
+        ensure_tag_index(conn)
+    engine.dispose()
+    conn = sqlite3.connect(path, isolation_level=None)
+    yield conn
+    conn.close()
+
+
+def insert(db, record_id, tags_sql):
+    # every NOT NULL column, as a script outside the app would have to fill them
+    required = [c.name for c in ExperimentRecord.__table__.c if not c.nullable and c.name not in ("id", "tags")]
+    values = ", ".join("CURRENT_TIMESTAMP" if name.endswith("_at") else "''" for name in required)
+    db.execute(f"INSERT INTO experimentrecord(id, tags, {', '.join(required)}) VALUES ({record_id}, {tags_sql}, {values})")
+
+
+def tags_of(db, record_id):
+    return sorted(r[0] for r in db.execute(
+        "SELECT tag.name FROM experimentrecordtag JOIN tag ON tag.id = tag_id WHERE entity_id = ?", (record_id,)))
+
+
+def counts(db):
+    return dict(db.execute(
+        "SELECT tag.name, count FROM tagcount JOIN tag ON tag.id = tag_id WHERE entity = 'records'"))
+
+
+def test_plain_sqlite_writes_maintain_links_and_counts(db):
+    insert(db, 1, "' qPCR, IL6,,qPCR'")
+    insert(db, 2, "'PCR,\"quoted\" \\ tag' || char(9)")
+    assert tags_of(db, 1) == ["IL6", "qPCR"]
+    assert tags_of(db, 2) == ['"quoted" \\ tag', "PCR"]
+    db.execute("UPDATE experimentrecord SET tags = 'IL6' WHERE id = 2")
+    assert counts(db) == {"IL6": 2, "qPCR": 1}
+    db.execute("DELETE FROM experimentrecord WHERE id = 1")
+    assert counts(db) == {"IL6": 1}
+
+
+def test_unparseable_tags_do_not_block_the_write(db):
+    insert(db, 1, "'x' || char(1) || ',y'")
+    assert tags_of(db, 1) == []
+
+
+def test_rebuild_matches_triggers(db):
+    insert(db, 1, "'a, b'")
+    insert(db, 2, "'b ,c,b'")
+    before = counts(db)
+    engine = create_engine(f"sqlite:///{db.execute('PRAGMA database_list').fetchone()[2]}")
+    with engine.begin() as conn:
+        rebuild_tags(conn)
+    assert counts(db) == before == {"a": 1, "b": 2, "c": 1}
@@ -42,6 +42,11 @@ class EntitiesApi {
     return rows.map((e) => Map<String, dynamic>.from(e as Map)).toList();
   }
 
+  // list rows leave out the markdown bodies; one item has every field
+  Future<Map<String, dynamic>> get(EntityKind kind, int id) async {
+    return client.getJson('/${kind.path}/$id');
+  }
+
   Future<Map<String, dynamic>> create(EntityKind kind, Map<String, dynamic> body) async {
     return client.postJson('/${kind.path}', body);
   }
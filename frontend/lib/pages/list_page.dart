@@ -425,6 +425,7 @@ class _Detail extends StatefulWidget {
 
 class _DetailState extends State<_Detail> {
   bool _saving = false;
+  bool _loading = true;
   String? _error;
 
   late Map<String, dynamic> draft = Map<String, dynamic>.from(widget.item);
@@ -436,17 +437,45 @@ class _DetailState extends State<_Detail> {
   late final _status = ValueNotifier<String>((draft['status'] ?? '계획').toString());
   late final _body = TextEditingController(text: (draft['body_markdown'] ?? draft['method_markdown'] ?? '').toString());
 
+  @override
+  void initState() {
+    super.initState();
+    _loadItem();
+  }
+
   @override
   void didUpdateWidget(covariant _Detail oldWidget) {
     super.didUpdateWidget(oldWidget);
     if (oldWidget.item['id'] != widget.item['id']) {
       draft = Map<String, dynamic>.from(widget.item);
-      _name.text = (draft['name'] ?? '').toString();
-      _title.text = (draft['title'] ?? '').toString();
-      _type.text = (draft['experiment_type'] ?? '').toString();
-      _date.text = (draft['date'] ?? '').toString();
-      _status.value = (draft['status'] ?? '계획').toString();
-      _body.text = (draft['body_markdown'] ?? draft['method_markdown'] ?? '').toString();
+      _fill();
+      _loading = true;
+      _loadItem();
+    }
+  }
+
+  void _fill() {
+    _name.text = (draft['name'] ?? '').toString();
+    _title.text = (draft['title'] ?? '').toString();
+    _type.text = (draft['experiment_type'] ?? '').toString();
+    _date.text = (draft['date'] ?? '').toString();
+    _status.value = (draft['status'] ?? '계획').toString();
+    _body.text = (draft['body_markdown'] ?? draft['method_markdown'] ?? '').toString();
+  }
+
+  // the list row has no markdown body: load the whole item before it can be edited and saved
+  Future<void> _loadItem() async {
+    final id = widget.item['id'];
+    try {
+      final item = await widget.api.get(widget.kind, (id as num).toInt());
+      if (!mounted || widget.item['id'] != id) return;
+      setState(() {
+        draft = item;
+        _fill();
+        _loading = false;
+      });
+    } catch (e) {
+      if (mounted && widget.item['id'] == id) setState(() => _error = e.toString());
     }
   }
 
@@ -555,7 +584,7 @@ class _DetailState extends State<_Detail> {
               ],
               OutlinedButton.icon(onPressed: _saving ? null : _delete, icon: const Icon(Icons.delete_outline), label: const Text('삭제')),
               const SizedBox(width: 8),
-              FilledButton.icon(onPressed: _saving ? null : _save, icon: const Icon(Icons.save), label: const Text('저장')),
+              FilledButton.icon(onPressed: _saving || _loading ? null : _save, icon: const Icon(Icons.save), label: const Text('저장')),
             ],
           ),
           if (_error != null) ...[